@@ -4,6 +4,7 @@ import numpy as np
 import plotly.express as px
 import joblib
 import os
+import sys
 from datetime import datetime
 
 # -------------------------------
@@ -27,6 +28,12 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "insurance_data_cleaned.parquet")
 
+sys.path.insert(0, PROJECT_ROOT)
+from src.sampling import SamplerConfig, stratified_sample, weighted_describe, WEIGHT_COLUMN  # noqa: E402
+from src.similarity import SimilarPolicyIndex  # noqa: E402
+
+SIMILARITY_INDEX_DIR = os.path.join(MODEL_DIR, "similar_policies")
+
 # -------------------------------
 # LOAD MODELS
 # -------------------------------
@@ -42,17 +49,25 @@ def load_models():
 
 clf_model, reg_model = load_models()
 
+@st.cache_resource
+def load_similarity_index():
+    # Memory-mapped arrays: built once by scripts/build_similarity_index.py
+    if not os.path.isdir(SIMILARITY_INDEX_DIR):
+        return None
+    return SimilarPolicyIndex.load(SIMILARITY_INDEX_DIR)
+
+similarity_index = load_similarity_index()
+
 # -------------------------------
 # LOAD DATA (Parquet)
 # -------------------------------
 @st.cache_data
 def load_data():
     try:
-        df = pd.read_parquet(DATA_PATH)
-        # Optional: sample if still too large
-        if len(df) > 20000:
-            df = df.sample(20000, random_state=42)
-        return df
+        # Stratified by Province × HasClaim in one streaming pass (never loads the full file).
+        # Rare claim rows are kept far more often than a uniform sample; SampleWeight
+        # re-weights aggregates back to the full book.
+        return stratified_sample(DATA_PATH, SamplerConfig(n_per_stratum=1000))
     except FileNotFoundError:
         st.error("❌ Parquet file not found. Please convert your CSV first.")
         return pd.DataFrame()
@@ -76,12 +91,17 @@ if page == "📊 Data Explorer" and not df.empty:
     st.header("📊 Portfolio Risk Overview")
     st.write("Data preview:", df.head())
     st.write("Unique provinces:", df["Province"].unique())
-    st.write("TotalClaims summary:", df["TotalClaims"].describe())
+    # Claim rows are oversampled: every figure below is re-weighted by SampleWeight
+    # to estimate the full book.
+    st.caption(f"Stratified sample of {len(df):,} rows, weighted to {df[WEIGHT_COLUMN].sum():,.0f} book rows.")
+    st.write("TotalClaims summary (book estimate):", weighted_describe(df["TotalClaims"], df[WEIGHT_COLUMN]))
 
 
     # Show quick diagnostics
-    st.write("Non‑zero claims count:", (df["TotalClaims"] > 0).sum())
-    st.write("Non‑zero premiums count:", (df["AnnualPremium"] > 0).sum())
+    st.write("Non‑zero claims count (book estimate):",
+             round((df[WEIGHT_COLUMN] * (df["TotalClaims"] > 0)).sum()))
+    st.write("Non‑zero premiums count (book estimate):",
+             round((df[WEIGHT_COLUMN] * (df["AnnualPremium"] > 0)).sum()))
 
     col1, col2 = st.columns(2)
 
@@ -90,7 +110,8 @@ if page == "📊 Data Explorer" and not df.empty:
         loss_ratio = (
             df[df["AnnualPremium"] > 0]
             .groupby("Province")
-            .apply(lambda x: x["TotalClaims"].sum() / (x["AnnualPremium"].sum() + 1e-9))
+            .apply(lambda x: (x["TotalClaims"] * x[WEIGHT_COLUMN]).sum()
+                   / ((x["AnnualPremium"] * x[WEIGHT_COLUMN]).sum() + 1e-9))
             .reset_index(name="Loss Ratio")
         )
         fig = px.bar(loss_ratio, x="Province", y="Loss Ratio",
@@ -103,6 +124,8 @@ if page == "📊 Data Explorer" and not df.empty:
         fig2 = px.histogram(
             df_nonzero_claims,
             x="TotalClaims",
+            y=WEIGHT_COLUMN,
+            histfunc="sum",       # weighted counts
             nbins=40,
             histnorm="percent",   # show % instead of raw counts
             title="Claim Amount Distribution (%)"
@@ -197,5 +220,13 @@ elif page == "🔮 Predict Risk" and not df.empty and clf_model and reg_model:
             st.success(f"**Risk Level:** {level}")
             st.info(f"**Suggested Premium Adjustment:** {adj}")
             st.caption("Risk Score = Probability of Claim × Expected Claim Amount")
+
+            if similarity_index is not None:
+                st.markdown("### 🗂️ Similar Historical Policies")
+                similar = similarity_index.query(input_df, k=10)
+                # One row per policy: share of similar policies with a claim, and claims per policy-year
+                st.write(f"Similar policies with a claim: {similar['has_claim'].mean()*100:.1f}%  |  "
+                         f"Claim frequency: {similar['claim_months'].sum() / similar['exposure_years'].sum():.3f} per policy-year")
+                st.dataframe(similar.drop(columns=["query"]), use_container_width=True)
         except Exception as e:
             st.error(f"Prediction failed: {e}")
\ No newline at end of file
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Roll raw cover × month transactions up to a policy-level exposure table."""
+import json
+import sys
+from pathlib import Path
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.rollup import RollupConfig, build_policy_table, claim_frequency  # noqa: E402
+
+
+def build_policy_exposure():
+    """Build data/processed/policy_table.parquet and report per-exposure-year KPIs."""
+
+    with open("params.yaml", 'r') as f:
+        params = yaml.safe_load(f)
+
+    raw_file = Path("data/raw") / params['data']['original_file']
+    output_path = Path(params['rollup']['output_file'])
+    config = RollupConfig(key=params['rollup']['key'], chunksize=params['rollup']['chunksize'])
+
+    print(f"🧮 Rolling up {raw_file} by {config.key}")
+    table = build_policy_table(raw_file, config, output_path=output_path)
+    print(f"✅ {len(table):,} rows written: {output_path}")
+
+    metrics = {
+        'key': config.key,
+        'rows': len(table),
+        'exposure_years': float(table['exposure_years'].sum()),
+        'claim_frequency_per_exposure_year': float(claim_frequency(table)),
+        'claim_frequency_by_province': claim_frequency(table, by=['last_Province']).to_dict()
+    }
+    metrics_path = Path("reports/policy_exposure_metrics.json")
+    with open(metrics_path, 'w') as f:
+        json.dump(metrics, f, indent=2)
+    print(f"📊 Claim frequency: {metrics['claim_frequency_per_exposure_year']:.4f} claims per exposure year")
+    return table
+
+
+if __name__ == "__main__":
+    build_policy_exposure()
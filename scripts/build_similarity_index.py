@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Build the similar-historical-policies index used by the dashboard."""
+import sys
+from pathlib import Path
+import pandas as pd
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.models import ModelConfig, DataPreprocessor  # noqa: E402
+from src.similarity import SimilarPolicyIndex  # noqa: E402
+
+INDEX_DIR = Path("models/similar_policies")
+CATEGORICAL = ['PostalCode', 'VehicleType', 'CoverType', 'Gender']
+NUMERICAL = ['SumInsured', 'RegistrationYear']
+OUTCOMES = ['claims', 'claim_months', 'exposure_years', 'has_claim']
+
+
+def build_similarity_index():
+    """Encode the policy table once and persist the index as memory-mappable arrays."""
+
+    with open("params.yaml", 'r') as f:
+        params = yaml.safe_load(f)
+
+    # One row per cover from scripts/build_policy_table.py, described by its latest month,
+    # so neighbours are distinct policies rather than months of the same cover.
+    table_path = Path(params['rollup']['output_file'])
+    key = params['rollup']['key']
+    print(f"📁 Loading {table_path}")
+    df = pd.read_parquet(table_path, columns=[key] + [f'last_{col}' for col in CATEGORICAL + NUMERICAL] + OUTCOMES)
+    df = df.rename(columns=lambda col: col[len('last_'):] if col.startswith('last_') else col)
+    df = df.dropna(subset=NUMERICAL)
+
+    config = ModelConfig(categorical_features=CATEGORICAL, numerical_features=NUMERICAL)
+    preprocessor = DataPreprocessor(config)
+    preprocessor.fit_transform(df[NUMERICAL + CATEGORICAL])
+
+    index = SimilarPolicyIndex.build(df, preprocessor, match_on=['PostalCode'], outcome_columns=OUTCOMES,
+                                     id_column=key)
+    index.save(INDEX_DIR)
+    print(f"✅ Indexed {len(df):,} policies in {len(index.arrays['partition_keys']):,} PostalCode partitions: {INDEX_DIR}")
+    return index
+
+
+if __name__ == "__main__":
+    build_similarity_index()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Ingest new monthly drop files and refresh provincial KPIs from merged aggregates."""
+import json
+import sys
+from pathlib import Path
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.ingestion import IngestionConfig, SegmentAggregates, ingest, AGGREGATES_FILE  # noqa: E402
+from src.validation import ingest_schema  # noqa: E402
+
+
+def ingest_increment(drop_files):
+    """Append only the new months from `drop_files` and update the KPI metrics."""
+
+    with open("params.yaml", 'r') as f:
+        params = yaml.safe_load(f)
+
+    config = IngestionConfig(
+        dataset_dir=params['ingestion']['dataset_dir'],
+        segment_columns=params['ingestion']['segment_columns'],
+        premium_scaling_factor=params['data']['premium_scaling_factor'],
+        missing_numerical=params['cleaning']['missing_numerical'],
+        missing_categorical=params['cleaning']['missing_categorical'],
+        schema=ingest_schema()
+    )
+
+    print(f"📥 Ingesting {len(drop_files)} drop file(s) into {config.dataset_dir}")
+    summary = ingest(drop_files, config)
+    violations = summary.pop('violations')
+    print(f"✅ Appended {summary['rows_appended']:,} rows "
+          f"({summary['files_skipped']} file(s) already ingested, "
+          f"{summary['late_rows_skipped']:,} late rows skipped); watermark: {summary['last_month']}")
+    if summary['invalid_rows_skipped']:
+        print(f"⚠️ {summary['invalid_rows_skipped']:,} row(s) with a missing or non-numeric amount were skipped")
+    if summary['restated_rows_skipped']:
+        print(f"⚠️ {summary['restated_rows_skipped']:,} row(s) restate the watermark month and were dropped; "
+              f"rebuild the dataset to apply restatements")
+    if not violations.ok:
+        print(f"⚠️ {violations.total:,} schema violation(s) in {violations.rows_checked:,} rows:")
+        print(violations.to_frame().to_string(index=False))
+
+    aggregates = SegmentAggregates.load(Path(config.dataset_dir) / AGGREGATES_FILE, config.segment_columns)
+    metrics = aggregates.metrics(premium_scaling_factor=config.premium_scaling_factor)
+    metrics_path = Path("reports/incremental_metrics.json")
+    with open(metrics_path, 'w') as f:
+        json.dump({
+            'ingestion': summary,
+            'violations': violations.to_frame().to_dict(orient='records'),
+            'by_segment': metrics.to_dict(orient='records')
+        }, f, indent=2, default=str)
+    print(f"📊 KPIs updated: {metrics_path}")
+    return summary
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/ingest_increment.py <drop_file> [<drop_file> ...]")
+        sys.exit(1)
+    ingest_increment(sys.argv[1:])
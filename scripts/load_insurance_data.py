@@ -4,9 +4,13 @@ Load pipe-separated insurance data and convert to CSV.
 """
 import pandas as pd
 import os
+import sys
 from pathlib import Path
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.sampling import SamplerConfig, StratifiedReservoirSampler  # noqa: E402
+
 
 def load_and_convert():
     """Load the pipe-separated TXT file and convert to CSV."""
@@ -159,11 +163,12 @@ def load_and_convert():
     print(f"✅ Saved as CSV: {csv_file}")
     print(f"   File size: {os.path.getsize(csv_file) / (1024*1024):.2f} MB")
 
-    # Save a sample for quick analysis
-    sample_size = min(5000, len(df))
+    # Save a stratified sample (Province × HasClaim) for quick analysis.
+    # Drawn from the frame already in memory; SampleWeight keeps totals unbiased.
     sample_file = data_dir / "insurance_sample.csv"
-    df.sample(sample_size, random_state=42).to_csv(sample_file, index=False)
-    print(f"📝 Saved {sample_size:,}-row sample: {sample_file}")
+    sample = StratifiedReservoirSampler(SamplerConfig(n_per_stratum=250, claim_oversample=4.0)).partial_fit(df).sample()
+    sample.to_csv(sample_file, index=False)
+    print(f"📝 Saved {len(sample):,}-row stratified sample: {sample_file}")
 
     # Save column description
     with open(data_dir / "column_description.txt", "w") as f:
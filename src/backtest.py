@@ -0,0 +1,151 @@
+"""
+Rolling-origin (walk-forward) backtesting of RiskModel over TransactionMonth.
+"""
+from dataclasses import dataclass, replace
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+from sklearn.metrics import roc_auc_score
+
+from src.models import MODES, ModelConfig, RiskModel, build_vocabulary
+from src.evaluation import calibration_report
+
+# ========== Constants ==========
+DATE_COLUMN = 'TransactionMonth'
+PREMIUM_COLUMN = 'TotalPremium'
+WINDOWS = ('expanding', 'sliding')
+# ================================
+
+
+@dataclass
+class BacktestConfig:
+    """Configuration for walk-forward backtesting."""
+    date_column: str = DATE_COLUMN
+    premium_column: str = PREMIUM_COLUMN
+    window: str = 'expanding'
+    min_train_months: int = 6
+    # Length of the training window when window='sliding'.
+    train_months: Optional[int] = None
+    test_months: int = 1
+    step_months: int = 1
+    # Folds run in parallel when n_jobs != 1; warm starting needs sequential folds.
+    n_jobs: int = 1
+    # Initialise each fold's logistic regression from the previous fold (linear backend only).
+    warm_start: bool = True
+
+
+def rolling_origin_folds(months: List[pd.Period], config: BacktestConfig) -> List[Tuple[List[pd.Period], List[pd.Period]]]:
+    """Split sorted months into (train_months, test_months) pairs that never look ahead."""
+    if config.window not in WINDOWS:
+        raise ValueError(f"window must be one of {WINDOWS}, got {config.window!r}")
+    train_months = config.train_months or config.min_train_months
+    folds = []
+    for origin in range(config.min_train_months, len(months) - config.test_months + 1, config.step_months):
+        start = 0 if config.window == 'expanding' else max(0, origin - train_months)
+        folds.append((months[start:origin], months[origin:origin + config.test_months]))
+    return folds
+
+
+def _run_fold(fold: int, train: pd.DataFrame, test: pd.DataFrame, model_config: ModelConfig,
+              premium_column: str, warm_start_from: Optional[Any] = None) -> Tuple[Dict[str, Any], RiskModel]:
+    """
+    Fit RiskModel on one training window and score the following test window.
+
+    The predicted loss ratio uses RiskModel.predict_expected_loss in both modes. In
+    'tweedie' mode there is no claim probability, so the AUC ranks claims by the
+    pure premium and the probability metrics (Brier, calibration ratio) are NaN.
+    """
+    features = model_config.categorical_features + model_config.numerical_features
+    model = RiskModel(model_config)
+    tweedie = model_config.mode == 'tweedie'
+
+    start = time.perf_counter()
+    if tweedie:
+        model.train_pure_premium(train[features], train[model_config.target_regression])
+    else:
+        model.train_classifier(train[features], train[model_config.target_classification],
+                               warm_start_from=warm_start_from)
+        model.train_regressor(train[features], train[model_config.target_regression])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected_loss = model.predict_expected_loss(test[features])
+    proba = None if tweedie else model.predict_claim_proba(model.preprocessor.transform(test[features]))
+    predict_seconds = time.perf_counter() - start
+
+    y_test = test[model_config.target_classification]
+    if tweedie:
+        # Same guard as calibration_report: AUC needs both classes in the window
+        base_rate = float(y_test.mean())
+        auc = float(roc_auc_score(y_test, expected_loss)) if 0 < base_rate < 1 else np.nan
+        calibration = {'auc': auc, 'brier': np.nan, 'calibration_ratio': np.nan}
+    else:
+        calibration = calibration_report(y_test, proba)
+    premium = test[premium_column].sum()
+    metrics = {
+        'fold': fold,
+        'n_train': len(train),
+        'n_test': len(test),
+        'auc': calibration['auc'],
+        'brier': calibration['brier'],
+        'calibration_ratio': calibration['calibration_ratio'],
+        'actual_loss_ratio': test[model_config.target_regression].sum() / premium if premium else np.nan,
+        'predicted_loss_ratio': expected_loss.sum() / premium if premium else np.nan,
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds
+    }
+    return metrics, model
+
+
+def run_backtest(df: pd.DataFrame, model_config: ModelConfig,
+                 config: Optional[BacktestConfig] = None) -> pd.DataFrame:
+    """
+    Walk forward over the months in `df`, training one RiskModel per fold.
+
+    The categorical vocabulary is built once over the whole frame (category labels
+    only, no targets), so every fold shares the same encoding and sequential folds
+    can warm-start the linear classifier from the previous fold; xgboost folds are
+    always trained from scratch. Folds follow `model_config.mode`. With `n_jobs` != 1 the folds are independent and
+    run in parallel instead.
+    """
+    config = config or BacktestConfig()
+    if model_config.mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {model_config.mode!r}")
+    months_col = pd.to_datetime(df[config.date_column]).dt.to_period('M')
+    months = sorted(months_col.unique())
+    folds = rolling_origin_folds(months, config)
+    if not folds:
+        raise ValueError(f"{len(months)} months is not enough for min_train_months={config.min_train_months}")
+
+    if model_config.target_classification not in df.columns:
+        df = df.assign(**{model_config.target_classification: (df[model_config.target_regression] > 0).astype(int)})
+    if model_config.categories is None:
+        model_config = replace(model_config, categories=build_vocabulary(df, model_config.categorical_features))
+
+    def split(train_months, test_months):
+        return df[months_col.isin(train_months).to_numpy()], df[months_col.isin(test_months).to_numpy()]
+
+    if config.n_jobs != 1:
+        results = Parallel(n_jobs=config.n_jobs)(
+            delayed(_run_fold)(i, *split(train_m, test_m), model_config, config.premium_column)
+            for i, (train_m, test_m) in enumerate(folds)
+        )
+        rows = [metrics for metrics, _ in results]
+    else:
+        rows, previous = [], None
+        for i, (train_m, test_m) in enumerate(folds):
+            warm = config.warm_start and previous is not None and model_config.backend == 'linear'
+            metrics, model = _run_fold(i, *split(train_m, test_m), model_config, config.premium_column,
+                                       warm_start_from=previous.clf if warm else None)
+            rows.append(metrics)
+            previous = model
+
+    report = pd.DataFrame(rows)
+    report.insert(1, 'train_start', [str(train_m[0]) for train_m, _ in folds])
+    report.insert(2, 'train_end', [str(train_m[-1]) for train_m, _ in folds])
+    report.insert(3, 'test_start', [str(test_m[0]) for _, test_m in folds])
+    report.insert(4, 'test_end', [str(test_m[-1]) for _, test_m in folds])
+    return report
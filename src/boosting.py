@@ -0,0 +1,116 @@
+"""
+Histogram gradient-boosting backend for RiskModel (xgboost `hist` trees).
+"""
+from typing import Any, Dict, Optional
+import numpy as np
+import xgboost as xgb
+
+# ========== Constants ==========
+XGBOOST_PARAMS = {
+    'tree_method': 'hist',
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'max_bin': 256,
+    'nthread': -1
+}
+NUM_BOOST_ROUND = 300
+EARLY_STOPPING_ROUNDS = 20
+VALIDATION_FRACTION = 0.1
+# ================================
+
+
+class HistGradientBoostingModel:
+    """
+    sklearn-style wrapper around `xgboost.train` on DataPreprocessor output.
+
+    Columns arrive in ColumnTransformer order (numerical, then ordinal-encoded
+    categorical). The categorical codes are passed to xgboost as native categorical
+    features, with the encoder's unknown value (-1) treated as missing. Training data
+    is quantized once into a QuantileDMatrix; callers that rerun with the same rows
+    can build it with `build_dmatrix` and pass it back through `fit(dtrain=...)`.
+    """
+
+    objective = 'reg:squarederror'
+
+    def __init__(self, n_numerical: int, n_categorical: int,
+                 params: Optional[Dict[str, Any]] = None,
+                 num_boost_round: int = NUM_BOOST_ROUND,
+                 early_stopping_rounds: Optional[int] = EARLY_STOPPING_ROUNDS,
+                 validation_fraction: float = VALIDATION_FRACTION,
+                 random_state: int = 0):
+        self.n_numerical = n_numerical
+        self.n_categorical = n_categorical
+        self.params = {**XGBOOST_PARAMS, 'objective': self.objective, 'seed': random_state, **(params or {})}
+        self.num_boost_round = num_boost_round
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.booster: Optional[xgb.Booster] = None
+
+    @property
+    def feature_types(self):
+        return ['q'] * self.n_numerical + ['c'] * self.n_categorical
+
+    def _prepare(self, X_proc: np.ndarray) -> np.ndarray:
+        """Cast to float32 and mark unknown categorical codes as missing."""
+        X = np.asarray(X_proc, dtype=np.float32).copy()
+        categorical = X[:, self.n_numerical:]
+        categorical[categorical < 0] = np.nan
+        return X
+
+    def build_dmatrix(self, X_proc: np.ndarray, y: Optional[np.ndarray] = None,
+                      sample_weight: Optional[np.ndarray] = None,
+                      ref: Optional[xgb.QuantileDMatrix] = None) -> xgb.QuantileDMatrix:
+        """Quantize preprocessed rows; pass `ref` to reuse the bin cuts of a training matrix."""
+        return xgb.QuantileDMatrix(self._prepare(X_proc), label=y, weight=sample_weight, ref=ref,
+                                   feature_types=self.feature_types, enable_categorical=True,
+                                   max_bin=self.params['max_bin'], nthread=self.params['nthread'])
+
+    def fit(self, X_proc: np.ndarray, y: np.ndarray, sample_weight: Optional[np.ndarray] = None,
+            dtrain: Optional[xgb.DMatrix] = None,
+            dvalid: Optional[xgb.DMatrix] = None) -> 'HistGradientBoostingModel':
+        """Train the booster, early-stopping on `dvalid` or on a seeded validation split."""
+        if dtrain is None:
+            y = np.asarray(y)
+            weight = None if sample_weight is None else np.asarray(sample_weight)
+            valid_mask = np.zeros(len(y), dtype=bool)
+            if dvalid is None and self.early_stopping_rounds and self.validation_fraction > 0:
+                rng = np.random.default_rng(self.random_state)
+                valid_mask = rng.random(len(y)) < self.validation_fraction
+            train_mask = ~valid_mask
+            dtrain = self.build_dmatrix(X_proc[train_mask], y[train_mask],
+                                        None if weight is None else weight[train_mask])
+            if valid_mask.any():
+                dvalid = self.build_dmatrix(X_proc[valid_mask], y[valid_mask],
+                                            None if weight is None else weight[valid_mask], ref=dtrain)
+
+        evals = [(dvalid, 'valid')] if dvalid is not None else []
+        self.booster = xgb.train(
+            self.params, dtrain,
+            num_boost_round=self.num_boost_round,
+            evals=evals,
+            early_stopping_rounds=self.early_stopping_rounds if evals else None,
+            verbose_eval=False
+        )
+        return self
+
+    def predict(self, X_proc: np.ndarray) -> np.ndarray:
+        data = xgb.DMatrix(self._prepare(X_proc), feature_types=self.feature_types,
+                           enable_categorical=True, nthread=self.params['nthread'])
+        best = getattr(self.booster, 'best_iteration', None)
+        iteration_range = (0, best + 1) if best is not None else (0, 0)
+        return self.booster.predict(data, iteration_range=iteration_range)
+
+
+class HistGradientBoostingClassifier(HistGradientBoostingModel):
+    """Binary claim classifier on histogram boosted trees."""
+
+    objective = 'binary:logistic'
+
+    def predict_proba(self, X_proc: np.ndarray) -> np.ndarray:
+        proba = self.predict(X_proc)
+        return np.column_stack([1 - proba, proba])
+
+
+class HistGradientBoostingRegressor(HistGradientBoostingModel):
+    """Claim amount regressor on histogram boosted trees."""
@@ -0,0 +1,42 @@
+"""
+Chunked readers for the raw pipe-separated file and the processed Parquet/CSV data.
+"""
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+import pandas as pd
+
+# ========== Constants ==========
+RAW_DELIMITER = '|'
+DEFAULT_CHUNKSIZE = 100_000
+# ================================
+
+
+def iter_chunks(path: Union[str, Path],
+                chunksize: int = DEFAULT_CHUNKSIZE,
+                columns: Optional[List[str]] = None,
+                delimiter: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the file at `path` as DataFrames of at most `chunksize` rows.
+
+    `.parquet` files are streamed batch by batch with pyarrow, `.txt` files use the
+    raw pipe delimiter and anything else is read as CSV. The full file is never
+    materialised, so memory is bounded by `chunksize`.
+    """
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        rows_seen = 0
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            # Running index, like the CSV reader, so row labels are file rows
+            chunk = batch.to_pandas().set_axis(pd.RangeIndex(rows_seen, rows_seen + batch.num_rows))
+            rows_seen += batch.num_rows
+            yield chunk
+        return
+
+    if delimiter is None:
+        delimiter = RAW_DELIMITER if path.suffix == '.txt' else ','
+    reader = pd.read_csv(path, delimiter=delimiter, usecols=columns,
+                         chunksize=chunksize, low_memory=False)
+    for chunk in reader:
+        yield chunk
@@ -0,0 +1,77 @@
+"""
+Model evaluation utilities.
+"""
+from typing import Any, Dict, Optional
+import pandas as pd
+import numpy as np
+from sklearn.metrics import roc_auc_score, brier_score_loss
+
+# ========== Constants ==========
+CALIBRATION_BINS = 10
+LIFT_BINS = 10
+# ================================
+
+
+def calibration_report(y_true: np.ndarray, proba: np.ndarray, n_bins: int = CALIBRATION_BINS) -> Dict[str, Any]:
+    """
+    Compare predicted claim probabilities with observed claim rates.
+
+    Rows are split into quantile bins of predicted probability, since claim
+    probabilities are heavily concentrated near zero. `calibration_ratio` is the
+    mean predicted probability over the observed base rate (1.0 = calibrated).
+    """
+    y_true = np.asarray(y_true).astype(float)
+    proba = np.asarray(proba, dtype=float)
+    bins = pd.qcut(pd.Series(proba).rank(method='first'), q=min(n_bins, len(proba)), labels=False)
+    table = (
+        pd.DataFrame({'bin': bins, 'predicted': proba, 'observed': y_true})
+        .groupby('bin')
+        .agg(count=('observed', 'size'), mean_predicted=('predicted', 'mean'), observed_rate=('observed', 'mean'))
+        .reset_index()
+    )
+    base_rate = float(y_true.mean())
+    mean_predicted = float(proba.mean())
+    has_both_classes = 0 < base_rate < 1
+    return {
+        'base_rate': base_rate,
+        'mean_predicted': mean_predicted,
+        'calibration_ratio': mean_predicted / base_rate if base_rate > 0 else float('nan'),
+        'brier': float(brier_score_loss(y_true, proba)),
+        'auc': float(roc_auc_score(y_true, proba)) if has_both_classes else float('nan'),
+        'bins': table
+    }
+
+
+def gini_coefficient(actual: np.ndarray, score: np.ndarray, exposure: Optional[np.ndarray] = None) -> float:
+    """
+    Normalized Gini of `score` as a ranking of `actual` losses (1.0 = perfect ordering).
+
+    Uses the ordered Lorenz curve: rows sorted by score, cumulative share of losses
+    against cumulative share of exposure (rows, if no exposure is given).
+    """
+    actual = np.asarray(actual, dtype=float)
+    exposure = np.ones_like(actual) if exposure is None else np.asarray(exposure, dtype=float)
+
+    def gini(order_by: np.ndarray) -> float:
+        order = np.argsort(order_by, kind='stable')
+        cum_exposure = np.concatenate([[0.0], np.cumsum(exposure[order])]) / exposure.sum()
+        cum_loss = np.concatenate([[0.0], np.cumsum(actual[order])]) / actual.sum()
+        area = np.sum(np.diff(cum_exposure) * (cum_loss[1:] + cum_loss[:-1]) / 2)
+        return 1 - 2 * area
+
+    return gini(np.asarray(score, dtype=float)) / gini(actual / exposure)
+
+
+def lift_table(actual: np.ndarray, score: np.ndarray, n_bins: int = LIFT_BINS) -> pd.DataFrame:
+    """Mean actual loss per score quantile, relative to the overall mean (lift)."""
+    actual = np.asarray(actual, dtype=float)
+    score = np.asarray(score, dtype=float)
+    bins = pd.qcut(pd.Series(score).rank(method='first'), q=min(n_bins, len(score)), labels=False)
+    table = (
+        pd.DataFrame({'bin': bins, 'score': score, 'actual': actual})
+        .groupby('bin')
+        .agg(count=('actual', 'size'), mean_score=('score', 'mean'), mean_actual=('actual', 'mean'))
+        .reset_index()
+    )
+    table['lift'] = table['mean_actual'] / actual.mean()
+    return table
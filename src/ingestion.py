@@ -0,0 +1,299 @@
+"""
+Incremental month-by-month ingestion with a watermark and mergeable segment aggregates.
+"""
+from dataclasses import dataclass, field, asdict
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.data_loader import iter_chunks, DEFAULT_CHUNKSIZE
+from src.validation import Schema, ViolationReport, validate
+
+# ========== Constants ==========
+DATASET_DIR = 'data/processed/transactions'
+WATERMARK_FILE = '_watermark.json'
+AGGREGATES_FILE = '_aggregates.parquet'
+# Pinned Parquet schema of the part files (read by pyarrow datasets, never as data)
+SCHEMA_FILE = '_common_metadata'
+MONTH_COLUMN = 'month'
+SUM_COLUMNS = ['rows', 'premium', 'claims', 'claim_count']
+FINGERPRINT_BLOCK_SIZE = 1 << 20
+NUMERICAL_STRATEGIES = ('median', 'mean')
+CATEGORICAL_STRATEGIES = ('mode',)
+# Identifiers, dates and money columns are never imputed
+DEFAULT_IMPUTE_EXCLUDE = ['UnderwrittenCoverID', 'PolicyID', 'TransactionMonth', 'TotalPremium', 'TotalClaims']
+# ================================
+
+
+@dataclass
+class IngestionConfig:
+    """Configuration for incremental ingestion."""
+    dataset_dir: str = DATASET_DIR
+    date_column: str = 'TransactionMonth'
+    segment_columns: List[str] = field(default_factory=lambda: ['Province'])
+    premium_column: str = 'TotalPremium'
+    claim_column: str = 'TotalClaims'
+    # TotalPremium is monthly; loss ratios are reported against annualised premium.
+    premium_scaling_factor: int = 12
+    # Imputation of missing values, as in params.yaml `cleaning`.
+    missing_numerical: str = 'median'
+    missing_categorical: str = 'mode'
+    impute_exclude: List[str] = field(default_factory=lambda: list(DEFAULT_IMPUTE_EXCLUDE))
+    chunksize: int = DEFAULT_CHUNKSIZE
+    # Checked on every chunk; violations are reported, rows are still ingested.
+    schema: Optional[Schema] = None
+
+
+@dataclass
+class Watermark:
+    """
+    Last ingested month plus fingerprints of every drop file already processed.
+
+    `fill_values` are the imputation values learned from the first ingested chunk;
+    they are reused for every later drop so all partitions are filled alike.
+    """
+    last_month: Optional[str] = None
+    fingerprints: List[str] = field(default_factory=list)
+    rows: int = 0
+    fill_values: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Watermark':
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, 'w') as f:
+            json.dump(asdict(self), f, indent=2)
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """SHA-256 of the file contents, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(FINGERPRINT_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def learn_fill_values(df: pd.DataFrame, config: IngestionConfig) -> Dict[str, Any]:
+    """Imputation value per column: median/mean for numeric columns, mode otherwise."""
+    if config.missing_numerical not in NUMERICAL_STRATEGIES:
+        raise ValueError(f"missing_numerical must be one of {NUMERICAL_STRATEGIES}")
+    if config.missing_categorical not in CATEGORICAL_STRATEGIES:
+        raise ValueError(f"missing_categorical must be one of {CATEGORICAL_STRATEGIES}")
+    fill_values = {}
+    for col in df.columns.difference(config.impute_exclude + [config.date_column]):
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            value = values.median() if config.missing_numerical == 'median' else values.mean()
+        else:
+            value = values.mode().iloc[0]
+        fill_values[col] = value.item() if isinstance(value, np.generic) else value
+    return fill_values
+
+
+def clean_chunk(df: pd.DataFrame, config: IngestionConfig, fill_values: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Apply the EDA cleaning steps to one chunk of transactions.
+
+    Missing values are imputed from `fill_values`, and the monthly premium is
+    annualised into AnnualPremium with the derived AnnualLossRatio and ProfitLoss
+    columns of the cleaned dataset.
+    """
+    df = df.fillna({col: value for col, value in fill_values.items() if col in df.columns})
+    premium = pd.to_numeric(df[config.premium_column], errors='coerce')
+    claims = pd.to_numeric(df[config.claim_column], errors='coerce')
+    annual = premium * config.premium_scaling_factor
+    return df.assign(
+        **{config.premium_column: premium, config.claim_column: claims},
+        AnnualPremium=annual,
+        AnnualLossRatio=claims / annual.replace(0, np.nan) * 100,
+        ProfitLoss=premium - claims
+    )
+
+
+def pin_schema(df: pd.DataFrame, schema: Optional[Any] = None) -> pa.Schema:
+    """
+    Fixed Parquet schema for the part files: float64 for numeric columns, string otherwise.
+
+    Columns with a numeric rule in the validation `schema` are always float64, so a
+    stray value or an all-null first chunk cannot make them text; other types come
+    from the first cleaned chunk and later chunks are cast to them.
+    """
+    numeric_rules = {rule.name for rule in schema.columns if rule.dtype == 'numeric'} if schema else set()
+    fields = []
+    for col in df.columns:
+        values = df[col]
+        numeric = col in numeric_rules or (
+            pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values))
+        fields.append(pa.field(str(col), pa.float64() if numeric else pa.string()))
+    return pa.schema(fields)
+
+
+def _to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """Conform a chunk to the pinned schema: same columns, numbers as float, rest as text."""
+    columns = {}
+    for f in schema:
+        values = df[f.name] if f.name in df.columns else pd.Series(np.nan, index=df.index)
+        if pa.types.is_floating(f.type):
+            columns[f.name] = pd.to_numeric(values, errors='coerce').astype(float)
+        else:
+            columns[f.name] = values.where(values.isna(), values.astype(str)).astype(object)
+    return pa.Table.from_pandas(pd.DataFrame(columns), schema=schema, preserve_index=False)
+
+
+class SegmentAggregates:
+    """
+    Additive per-segment, per-month sums (rows, premium, claims, claim count).
+
+    Only sums are stored, so aggregates from different chunks or monthly drops are
+    merged by adding them; loss ratio, frequency and severity are derived on demand.
+    """
+
+    def __init__(self, by: List[str], sums: Optional[pd.DataFrame] = None):
+        self.by = by
+        keys = by + [MONTH_COLUMN]
+        self.sums = sums if sums is not None else pd.DataFrame(columns=keys + SUM_COLUMNS)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, months: pd.Series, config: IngestionConfig) -> 'SegmentAggregates':
+        claims = pd.to_numeric(df[config.claim_column], errors='coerce')
+        frame = pd.DataFrame({
+            **{col: df[col] for col in config.segment_columns},
+            MONTH_COLUMN: months,
+            'rows': 1,
+            'premium': pd.to_numeric(df[config.premium_column], errors='coerce'),
+            'claims': claims,
+            'claim_count': (claims > 0).astype(int)
+        })
+        keys = config.segment_columns + [MONTH_COLUMN]
+        return cls(config.segment_columns, frame.groupby(keys, dropna=False, as_index=False)[SUM_COLUMNS].sum())
+
+    def merge(self, other: 'SegmentAggregates') -> 'SegmentAggregates':
+        keys = self.by + [MONTH_COLUMN]
+        frames = [f for f in (self.sums, other.sums) if not f.empty]
+        if not frames:
+            return SegmentAggregates(self.by)
+        combined = pd.concat(frames, ignore_index=True)
+        return SegmentAggregates(self.by, combined.groupby(keys, dropna=False, as_index=False)[SUM_COLUMNS].sum())
+
+    def metrics(self, by: Optional[List[str]] = None, premium_scaling_factor: int = 1) -> pd.DataFrame:
+        """Loss ratio, claim frequency and severity, rolled up to `by` (default: segments)."""
+        by = self.by if by is None else by
+        totals = self.sums.groupby(by, dropna=False)[SUM_COLUMNS].sum() if by else self.sums[SUM_COLUMNS].sum().to_frame().T
+        totals = totals.astype(float)
+        totals['loss_ratio'] = totals['claims'] / (totals['premium'] * premium_scaling_factor).replace(0, np.nan)
+        totals['claim_frequency'] = totals['claim_count'] / totals['rows']
+        totals['claim_severity'] = totals['claims'] / totals['claim_count'].replace(0, np.nan)
+        return totals.reset_index() if by else totals
+
+    @classmethod
+    def load(cls, path: Union[str, Path], by: List[str]) -> 'SegmentAggregates':
+        path = Path(path)
+        return cls(by, pd.read_parquet(path)) if path.exists() else cls(by)
+
+    def save(self, path: Union[str, Path]) -> None:
+        self.sums.to_parquet(path, index=False)
+
+
+def ingest(paths: List[Union[str, Path]], config: Optional[IngestionConfig] = None) -> Dict[str, Any]:
+    """
+    Append new monthly drops to the partitioned dataset and merge their aggregates.
+
+    Each drop is skipped if its fingerprint was already ingested; otherwise only rows
+    after the watermark month are cleaned (see clean_chunk) and written, as Parquet
+    files with one pinned schema under `<dataset_dir>/month=YYYY-MM/`, and their sums
+    are merged into the stored aggregates. Work is proportional to the new files,
+    not to the stored history. Part files are named after the drop fingerprint, so
+    rerunning an interrupted drop overwrites its partial output instead of
+    duplicating it. With `config.schema` each chunk is validated and violations are
+    returned under 'violations'; rows without a parseable month are never appended.
+
+    Rows whose premium or claim amount is missing or not a number are never
+    appended either (they would poison the aggregates) and are counted under
+    'invalid_rows_skipped'.
+
+    Rows for the watermark month itself in a later drop (restatements) are dropped,
+    not merged, and counted under 'restated_rows_skipped'; rows for earlier months
+    are counted under 'late_rows_skipped'. Restating a month means rebuilding the
+    dataset from the corrected drops.
+    """
+    config = config or IngestionConfig()
+    dataset_dir = Path(config.dataset_dir)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    watermark = Watermark.load(dataset_dir / WATERMARK_FILE)
+    aggregates = SegmentAggregates.load(dataset_dir / AGGREGATES_FILE, config.segment_columns)
+    schema_path = dataset_dir / SCHEMA_FILE
+    part_schema = pq.read_schema(schema_path) if schema_path.exists() else None
+    summary = {'files_ingested': 0, 'files_skipped': 0, 'rows_appended': 0,
+               'late_rows_skipped': 0, 'restated_rows_skipped': 0, 'undated_rows_skipped': 0,
+               'invalid_rows_skipped': 0}
+    violations = ViolationReport()
+
+    for path in paths:
+        fingerprint = file_fingerprint(path)
+        if fingerprint in watermark.fingerprints:
+            summary['files_skipped'] += 1
+            continue
+
+        newest, file_rows = watermark.last_month, 0
+        for i, chunk in enumerate(iter_chunks(path, chunksize=config.chunksize)):
+            if config.schema is not None:
+                validate(chunk, config.schema, violations)
+            parsed = pd.to_datetime(chunk[config.date_column], errors='coerce')
+            months = parsed.dt.to_period('M').astype(str)
+            dated = parsed.notna()
+            if watermark.last_month:
+                is_new = dated & (months > watermark.last_month)
+                summary['late_rows_skipped'] += int((dated & (months < watermark.last_month)).sum())
+                summary['restated_rows_skipped'] += int((dated & (months == watermark.last_month)).sum())
+            else:
+                is_new = dated
+            summary['undated_rows_skipped'] += int((~dated).sum())
+            money_ok = pd.Series(True, index=chunk.index)
+            for col in (config.premium_column, config.claim_column):
+                money_ok &= pd.to_numeric(chunk[col], errors='coerce').notna()
+            summary['invalid_rows_skipped'] += int((is_new & ~money_ok).sum())
+            is_new &= money_ok
+            chunk, months = chunk[is_new], months[is_new]
+            if chunk.empty:
+                continue
+
+            if not watermark.fill_values:
+                watermark.fill_values = learn_fill_values(chunk, config)
+            chunk = clean_chunk(chunk, config, watermark.fill_values)
+            if part_schema is None:
+                part_schema = pin_schema(chunk, config.schema)
+                pq.write_metadata(part_schema, schema_path)
+
+            for month, part in chunk.groupby(months, sort=False):
+                partition = dataset_dir / f"{MONTH_COLUMN}={month}"
+                partition.mkdir(exist_ok=True)
+                pq.write_table(_to_table(part, part_schema),
+                               partition / f"part-{fingerprint[:16]}-{i:05d}.parquet")
+            aggregates = aggregates.merge(SegmentAggregates.from_frame(chunk, months, config))
+            newest = max(filter(None, [newest, months.max()]))
+            file_rows += len(chunk)
+
+        watermark.fingerprints.append(fingerprint)
+        watermark.last_month = newest
+        watermark.rows += file_rows
+        summary['rows_appended'] += file_rows
+        summary['files_ingested'] += 1
+
+    aggregates.save(dataset_dir / AGGREGATES_FILE)
+    watermark.save(dataset_dir / WATERMARK_FILE)
+    summary['last_month'] = watermark.last_month
+    summary['violations'] = violations
+    return summary
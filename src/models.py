@@ -1,14 +1,15 @@
 """
 Model training and prediction utilities.
 """
-from dataclasses import dataclass
-from typing import Tuple, Any, Dict, List
+import warnings
+from dataclasses import dataclass, field
+from typing import Tuple, Any, Dict, List, Optional
 import pandas as pd
 import numpy as np
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OrdinalEncoder
-from sklearn.linear_model import LogisticRegression, LinearRegression
+from sklearn.linear_model import LogisticRegression, LinearRegression, TweedieRegressor
 import joblib
 
 # ========== Constants ==========
@@ -21,6 +22,17 @@ CLASSIFIER_PARAMS = {
 REGRESSOR_PARAMS = {
     'fit_intercept': True
 }
+TWEEDIE_PARAMS = {
+    'link': 'log',
+    'alpha': 1e-4,
+    'max_iter': 1000
+}
+DOWNSAMPLE_CORRECTIONS = ('offset', 'weight')
+BACKENDS = ('linear', 'xgboost')
+MODES = ('two_stage', 'tweedie')
+ON_VIOLATION = ('raise', 'mask', 'warn')
+# Keys of ModelConfig.backend_params that configure the boosting loop rather than xgboost itself.
+BOOSTING_LOOP_PARAMS = ('num_boost_round', 'early_stopping_rounds', 'validation_fraction')
 # ================================
 
 @dataclass
@@ -32,6 +44,24 @@ class ModelConfig:
     target_regression: str = 'TotalClaims'
     test_size: float = TEST_SIZE
     random_state: int = RANDOM_STATE
+    # Fraction of non-claim rows kept by train_classifier (1.0 = no downsampling).
+    negative_sample_rate: float = 1.0
+    # 'offset' shifts the logit by log(rate); 'weight' refits with 1/rate weights on negatives.
+    downsample_correction: str = 'offset'
+    # Fixed category vocabulary per categorical feature (see build_vocabulary); None = learn on fit.
+    categories: Optional[Dict[str, List[Any]]] = None
+    # Estimator family: 'linear' (LogisticRegression/LinearRegression) or 'xgboost' (hist trees).
+    backend: str = 'linear'
+    # Extra xgboost parameters plus num_boost_round / early_stopping_rounds / validation_fraction.
+    backend_params: Dict[str, Any] = field(default_factory=dict)
+    # 'two_stage' = claim probability × claim amount; 'tweedie' = one pure-premium model.
+    mode: str = 'two_stage'
+    # Tweedie variance power in (1, 2): compound Poisson-Gamma.
+    tweedie_power: float = 1.5
+
+def build_vocabulary(df: pd.DataFrame, categorical_features: List[str]) -> Dict[str, List[Any]]:
+    """Sorted non-null category values per feature, for a fixed OrdinalEncoder vocabulary."""
+    return {col: sorted(df[col].dropna().unique().tolist()) for col in categorical_features}
 
 class DataPreprocessor:
     """Handles data preprocessing pipelines."""
@@ -45,8 +75,12 @@ class DataPreprocessor:
         numerical_pipeline = Pipeline([
             ('scaler', StandardScaler())
         ])
+        categories = 'auto'
+        if self.config.categories is not None:
+            categories = [self.config.categories[col] for col in self.config.categorical_features]
         categorical_pipeline = Pipeline([
-            ('encoder', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1))
+            ('encoder', OrdinalEncoder(categories=categories,
+                                       handle_unknown='use_encoded_value', unknown_value=-1))
         ])
         return ColumnTransformer([
             ('num', numerical_pipeline, self.config.numerical_features),
@@ -58,6 +92,11 @@ class DataPreprocessor:
     
     def transform(self, X: pd.DataFrame) -> np.ndarray:
         return self.preprocessor.transform(X)
+    
+    def fitted_categories(self) -> Dict[str, List[Any]]:
+        """Category vocabulary learned by the fitted encoder, per categorical feature."""
+        encoder = self.preprocessor.named_transformers_['cat'].named_steps['encoder']
+        return {col: cats.tolist() for col, cats in zip(self.config.categorical_features, encoder.categories_)}
 
 class RiskModel:
     """Combined classification + regression model for risk scoring."""
@@ -67,37 +106,247 @@ class RiskModel:
         self.preprocessor = DataPreprocessor(config)
         self.clf: LogisticRegression = None
         self.reg: LinearRegression = None
+        # Single pure-premium estimator used when config.mode == 'tweedie'.
+        self.pure_premium: TweedieRegressor = None
+        # Log-odds correction added to classifier output after negative downsampling.
+        self.clf_offset: float = 0.0
+    
+    def negative_sample_mask(self, y: pd.Series) -> np.ndarray:
+        """Rows kept by negative downsampling: every claim and a seeded `negative_sample_rate` fraction of the rest."""
+        rng = np.random.default_rng(self.config.random_state)
+        y_arr = np.asarray(y)
+        return (y_arr == 1) | (rng.random(len(y_arr)) < self.config.negative_sample_rate)
+    
+    def _downsample_weights(self, y: pd.Series) -> Optional[np.ndarray]:
+        """Importance weights 1/rate on kept negatives with the 'weight' correction, else None."""
+        if self.config.negative_sample_rate == 1 or self.config.downsample_correction != 'weight':
+            return None
+        return np.where(np.asarray(y) == 1, 1.0, 1.0 / self.config.negative_sample_rate)
     
-    def train_classifier(self, X: pd.DataFrame, y: pd.Series) -> None:
-        """Train logistic regression classifier."""
+    def _make_estimator(self, task: str, linear_params: Optional[Dict[str, Any]] = None) -> Any:
+        """Build the classifier or regressor for the configured backend."""
+        if self.config.backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {self.config.backend!r}")
+        if self.config.backend == 'linear':
+            if task == 'classifier':
+                return LogisticRegression(random_state=self.config.random_state, **linear_params)
+            if task == 'tweedie':
+                return TweedieRegressor(power=self.config.tweedie_power, **TWEEDIE_PARAMS)
+            return LinearRegression(**REGRESSOR_PARAMS)
+
+        from src.boosting import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+        params = dict(self.config.backend_params)
+        if task == 'tweedie':
+            params = {'objective': 'reg:tweedie', 'tweedie_variance_power': self.config.tweedie_power, **params}
+        loop_params = {k: params.pop(k) for k in BOOSTING_LOOP_PARAMS if k in params}
+        estimator_cls = HistGradientBoostingClassifier if task == 'classifier' else HistGradientBoostingRegressor
+        return estimator_cls(len(self.config.numerical_features), len(self.config.categorical_features),
+                             params=params, random_state=self.config.random_state, **loop_params)
+    
+    def build_dmatrix(self, X: pd.DataFrame, y: Optional[pd.Series] = None, ref: Any = None,
+                      downsample: bool = False) -> Any:
+        """
+        Quantize rows once for the xgboost backend, so repeated training runs on the same
+        data can pass them to train_classifier/train_regressor as `dtrain`/`dvalid`.
+        Requires a fitted preprocessor.
+
+        With `downsample` the classifier's negative downsampling (negative_sample_mask)
+        and its 1/rate weights are applied, which train_classifier requires of `dtrain`
+        when `negative_sample_rate` < 1.
+        """
+        X_proc = self.preprocessor.transform(X)
+        y = None if y is None else np.asarray(y)
+        weight = None
+        if downsample:
+            if y is None:
+                raise ValueError("downsample needs the claim labels y")
+            keep = self.negative_sample_mask(y)
+            X_proc, y = X_proc[keep], y[keep]
+            weight = self._downsample_weights(y)
+        matrix = self._make_estimator('regressor').build_dmatrix(X_proc, y, sample_weight=weight, ref=ref)
+        matrix.negative_sample_rate = self.config.negative_sample_rate if downsample else 1.0
+        return matrix
+    
+    def train_classifier(self, X: pd.DataFrame, y: pd.Series,
+                         warm_start_from: Optional[Any] = None,
+                         dtrain: Any = None, dvalid: Any = None) -> None:
+        """
+        Train the claim classifier (logistic regression or boosted trees, per `backend`).
+
+        With `negative_sample_rate` < 1 the non-claim rows are subsampled and the
+        class reweighting is dropped; predicted probabilities are then mapped back to
+        the true base rate, either by a closed-form logit offset of log(rate) or by
+        importance weights of 1/rate on the kept negatives.
+
+        `warm_start_from` initialises the logistic regression solver from a previously
+        fitted classifier with the same feature layout (e.g. the previous backtest fold).
+        It is ignored by the xgboost backend: continuing boosting would stack new trees
+        on ones grown against another window's scaling, so trees are refit. `dtrain` and
+        `dvalid` are prebuilt xgboost matrices (see build_dmatrix) holding the rows the
+        classifier would train on; X is then only used to fit the preprocessor. With
+        downsampling, `dtrain` must be built with build_dmatrix(..., downsample=True).
+        """
+        rate = self.config.negative_sample_rate
+        if not 0 < rate <= 1:
+            raise ValueError(f"negative_sample_rate must be in (0, 1], got {rate}")
+        if dtrain is not None and rate < 1 and getattr(dtrain, 'negative_sample_rate', 1.0) != rate:
+            raise ValueError("dtrain must be built with build_dmatrix(..., downsample=True) "
+                             "when negative_sample_rate < 1")
+        if self.config.downsample_correction not in DOWNSAMPLE_CORRECTIONS:
+            raise ValueError(f"downsample_correction must be one of {DOWNSAMPLE_CORRECTIONS}")
+
+        self.clf_offset = 0.0
+        params = dict(CLASSIFIER_PARAMS)
+        sample_weight = None
+        # Fit the scaler and vocabulary on the full book, not the claim-enriched sample
         X_proc = self.preprocessor.fit_transform(X)
-        self.clf = LogisticRegression(random_state=self.config.random_state, **CLASSIFIER_PARAMS)
-        self.clf.fit(X_proc, y)
+        if rate < 1:
+            keep = self.negative_sample_mask(y)
+            X_proc, y = X_proc[keep], y[keep]
+            params.pop('class_weight', None)
+            sample_weight = self._downsample_weights(y)
+            if self.config.downsample_correction == 'offset':
+                self.clf_offset = float(np.log(rate))
+
+        self.clf = self._make_estimator('classifier', params)
+        if self.config.backend == 'xgboost':
+            self.clf.fit(X_proc, y, sample_weight=sample_weight, dtrain=dtrain, dvalid=dvalid)
+            return
+        if warm_start_from is not None and getattr(warm_start_from, 'coef_', None) is not None \
+                and warm_start_from.coef_.shape[1] == X_proc.shape[1]:
+            self.clf.set_params(warm_start=True)
+            self.clf.coef_ = warm_start_from.coef_.copy()
+            self.clf.intercept_ = warm_start_from.intercept_.copy()
+        self.clf.fit(X_proc, y, sample_weight=sample_weight)
+    
+    def predict_claim_proba(self, X_proc: np.ndarray) -> np.ndarray:
+        """Claim probability for preprocessed rows, corrected for negative downsampling."""
+        proba = self.clf.predict_proba(X_proc)[:, 1]
+        if self.clf_offset == 0.0:
+            return proba
+        odds = np.exp(self.clf_offset) * proba / np.clip(1 - proba, 1e-15, None)
+        return odds / (1 + odds)
     
-    def train_regressor(self, X: pd.DataFrame, y: pd.Series) -> None:
-        """Train linear regression regressor."""
+    def train_regressor(self, X: pd.DataFrame, y: pd.Series,
+                        dtrain: Any = None, dvalid: Any = None) -> None:
+        """Train the claim amount regressor (linear regression or boosted trees, per `backend`)."""
         X_proc = self.preprocessor.transform(X)  # use same preprocessing
-        self.reg = LinearRegression(**REGRESSOR_PARAMS)
-        self.reg.fit(X_proc, y)
+        self.reg = self._make_estimator('regressor')
+        if self.config.backend == 'xgboost':
+            self.reg.fit(X_proc, y, dtrain=dtrain, dvalid=dvalid)
+        else:
+            self.reg.fit(X_proc, y)
     
-    def predict_risk_score(self, X: pd.DataFrame) -> np.ndarray:
+    def train_pure_premium(self, X: pd.DataFrame, y: pd.Series,
+                           exposure: Optional[pd.Series] = None) -> None:
+        """
+        Fit one Tweedie (compound Poisson-Gamma, log link) model directly on claim amounts.
+
+        With `exposure` (e.g. earned premium months) the model is fitted on the claim
+        rate y / exposure weighted by exposure, and predictions are per unit of exposure.
+        """
+        X_proc = self.preprocessor.fit_transform(X)
+        y = np.asarray(y, dtype=float)
+        sample_weight = None
+        if exposure is not None:
+            sample_weight = np.asarray(exposure, dtype=float)
+            y = y / sample_weight
+        self.pure_premium = self._make_estimator('tweedie')
+        self.pure_premium.fit(X_proc, y, sample_weight=sample_weight)
+    
+    def validate_inputs(self, X: pd.DataFrame) -> Any:
+        """Check scoring rows against the fitted feature schema; returns a ViolationReport."""
+        from src.validation import validate
+        return validate(X, self._scoring_schema())
+    
+    def _scoring_schema(self) -> Any:
+        from src.validation import scoring_schema
+        return scoring_schema(self.config, self.preprocessor.fitted_categories())
+    
+    def predict_risk_score(self, X: pd.DataFrame, exposure: Optional[pd.Series] = None,
+                           validate: bool = True, on_violation: str = 'mask') -> np.ndarray:
         """
         Compute risk score = probability_of_claim * predicted_claim_amount.
+
+        In 'tweedie' mode the score is the pure premium from a single model (one
+        transform and one dot product per row), scaled by `exposure` if given.
+        With `validate`, rows are first checked for non-numeric values and unseen
+        categories. `on_violation` decides what happens to failing rows: 'mask'
+        scores them as NaN, 'warn' still scores rows whose only problem is an unseen
+        category (encoded as unknown) but masks missing or non-numeric values, and
+        'raise' fails the batch with a DataValidationError. 'mask' and 'warn' emit a
+        UserWarning; validate_inputs gives the full report.
         """
+        if self.config.mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {self.config.mode!r}")
+        if on_violation not in ON_VIOLATION:
+            raise ValueError(f"on_violation must be one of {ON_VIOLATION}, got {on_violation!r}")
+        invalid = None
+        if validate:
+            from src.validation import DataValidationError, Schema, ViolationReport, validate_rows
+            schema = self._scoring_schema()
+            report = ViolationReport()
+            invalid = validate_rows(X, schema, report)
+            if report.ok:
+                invalid = None
+            elif on_violation == 'raise':
+                raise DataValidationError(report)
+            else:
+                n_rows = int(invalid.sum())
+                if on_violation == 'warn':
+                    # Unseen categories encode as unknown, but bad values cannot be scored at all
+                    invalid = validate_rows(X, Schema([rule for rule in schema.columns if rule.allowed is None]))
+                warnings.warn(f"{report.total} schema violation(s) in {n_rows} row(s); "
+                              f"{int(invalid.sum())} row(s) scored as NaN", UserWarning, stacklevel=2)
+        if invalid is not None:
+            scores = np.full(len(X), np.nan)
+            valid = ~invalid
+            if valid.any():
+                X_valid = X[valid].copy()
+                # Numbers held as text (e.g. object columns from a form) pass validation
+                for col in self.config.numerical_features:
+                    X_valid[col] = pd.to_numeric(X_valid[col], errors='coerce')
+                scores[valid] = self.predict_risk_score(
+                    X_valid, None if exposure is None else np.asarray(exposure)[valid], validate=False)
+            return scores
         X_proc = self.preprocessor.transform(X)
-        proba = self.clf.predict_proba(X_proc)[:, 1]
+        if self.config.mode == 'tweedie':
+            return self._expected_loss(X_proc, exposure)
+        proba = self.predict_claim_proba(X_proc)
         amount = self.reg.predict(X_proc)
         # Normalize score to 0-100
         raw_score = proba * amount
         # You might want to store min/max from training to scale
         return raw_score  # or scale using training stats
     
+    def _expected_loss(self, X_proc: np.ndarray, exposure: Optional[pd.Series] = None) -> np.ndarray:
+        if self.config.mode == 'tweedie':
+            loss = self.pure_premium.predict(X_proc)
+        else:
+            loss = np.clip(self.reg.predict(X_proc), 0, None)
+        return loss if exposure is None else loss * np.asarray(exposure, dtype=float)
+    
+    def predict_expected_loss(self, X: pd.DataFrame, exposure: Optional[pd.Series] = None) -> np.ndarray:
+        """
+        Expected claim amount per row, E[L], e.g. for predicted loss ratios.
+
+        In 'tweedie' mode this is the pure premium (the risk score). In 'two_stage'
+        mode it is the regressor's prediction floored at 0: the regressor is fitted
+        on TotalClaims over every row, so it already is E[L], and the risk score
+        (probability × amount) would count the claim probability twice.
+        """
+        if self.config.mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {self.config.mode!r}")
+        return self._expected_loss(self.preprocessor.transform(X), exposure)
+    
     def save(self, path: str) -> None:
         joblib.dump({
             'config': self.config,
             'preprocessor': self.preprocessor,
             'clf': self.clf,
-            'reg': self.reg
+            'clf_offset': self.clf_offset,
+            'reg': self.reg,
+            'pure_premium': self.pure_premium
         }, path)
     
     @classmethod
@@ -106,5 +355,7 @@ class RiskModel:
         model = cls(data['config'])
         model.preprocessor = data['preprocessor']
         model.clf = data['clf']
+        model.clf_offset = data.get('clf_offset', 0.0)
         model.reg = data['reg']
+        model.pure_premium = data.get('pure_premium')
         return model
\ No newline at end of file
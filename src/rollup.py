@@ -0,0 +1,144 @@
+"""
+Roll transaction rows (cover × month) up to one row per cover or policy with earned exposure.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Union
+import pandas as pd
+
+from src.data_loader import iter_chunks, DEFAULT_CHUNKSIZE
+
+# ========== Constants ==========
+COVER_KEY = 'UnderwrittenCoverID'
+SUM_COLUMNS = ['earned_months', 'premium', 'claims', 'claim_months']
+DEFAULT_ATTRIBUTES = ['PolicyID', 'Province', 'PostalCode', 'VehicleType', 'CoverType', 'Gender',
+                      'SumInsured', 'RegistrationYear']
+# ================================
+
+
+@dataclass
+class RollupConfig:
+    """Configuration for the policy/cover exposure rollup."""
+    key: str = COVER_KEY
+    date_column: str = 'TransactionMonth'
+    premium_column: str = 'TotalPremium'
+    claim_column: str = 'TotalClaims'
+    # Carried as first_<col> / last_<col>: values on the first and last month seen.
+    attributes: List[str] = field(default_factory=lambda: list(DEFAULT_ATTRIBUTES))
+    chunksize: int = DEFAULT_CHUNKSIZE
+
+
+class PolicyRollup:
+    """
+    Streaming, mergeable aggregation of transactions to one row per `key`.
+
+    Each chunk is reduced with a hash-based (sort=False) groupby into partial
+    aggregates: summed premium, claims, earned months and claim months, the
+    first/last month seen, and the attributes on those months. Partials merge
+    with the same reduction, so memory is bounded by the number of distinct keys
+    plus one chunk, never by the file length.
+
+    The raw file has one row per cover per month, so for the cover key every row
+    is one earned month. Any other key (e.g. PolicyID) can have several covers in
+    the same month, so earned and claim months are counted over distinct
+    (key, month) pairs, kept in a second table bounded by the number of such pairs.
+    """
+
+    def __init__(self, config: Optional[RollupConfig] = None):
+        self.config = config or RollupConfig()
+        self._table: Optional[pd.DataFrame] = None
+        self._months: Optional[pd.DataFrame] = None
+
+    @property
+    def _first_columns(self) -> List[str]:
+        return [f'first_{col}' for col in self.config.attributes]
+
+    @property
+    def _last_columns(self) -> List[str]:
+        return [f'last_{col}' for col in self.config.attributes]
+
+    def _rows_as_partials(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Express each transaction row as a single-row partial aggregate."""
+        config = self.config
+        dates = pd.to_datetime(chunk[config.date_column], errors='coerce')
+        valid = (dates.notna() & chunk[config.key].notna()).to_numpy()
+        chunk, dates = chunk[valid], dates[valid]
+        month = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()
+        claims = chunk[config.claim_column].astype(float).to_numpy()
+        attributes = {col: chunk[col].to_numpy() for col in config.attributes}
+        return pd.DataFrame({
+            config.key: chunk[config.key].to_numpy(),
+            'first_month': month,
+            'last_month': month,
+            'earned_months': 1,
+            'premium': chunk[config.premium_column].astype(float).to_numpy(),
+            'claims': claims,
+            'claim_months': (claims > 0).astype(int),
+            **{f'first_{col}': values for col, values in attributes.items()},
+            **{f'last_{col}': values for col, values in attributes.items()}
+        })
+
+    def _reduce(self, partials: pd.DataFrame) -> pd.DataFrame:
+        """Combine partial aggregates that share a key."""
+        partials = partials.reset_index(drop=True)
+        grouped = partials.groupby(self.config.key, sort=False)
+        reduced = grouped[SUM_COLUMNS].sum()
+        first_rows = grouped['first_month'].idxmin().to_numpy()
+        last_rows = grouped['last_month'].idxmax().to_numpy()
+        reduced['first_month'] = partials['first_month'].to_numpy()[first_rows]
+        reduced['last_month'] = partials['last_month'].to_numpy()[last_rows]
+        for col in self._first_columns:
+            reduced[col] = partials[col].to_numpy()[first_rows]
+        for col in self._last_columns:
+            reduced[col] = partials[col].to_numpy()[last_rows]
+        return reduced.reset_index()
+
+    def partial_fit(self, chunk: pd.DataFrame) -> 'PolicyRollup':
+        """Fold the next chunk of transactions into the running aggregates."""
+        partials = self._rows_as_partials(chunk)
+        partial = self._reduce(partials)
+        self._table = partial if self._table is None else self._reduce(pd.concat([self._table, partial]))
+        if self.config.key != COVER_KEY:
+            months = partials[[self.config.key, 'first_month', 'claim_months']]
+            if self._months is not None:
+                months = pd.concat([self._months, months])
+            self._months = months.groupby([self.config.key, 'first_month'], sort=False, as_index=False)['claim_months'].max()
+        return self
+
+    def table(self) -> pd.DataFrame:
+        """One row per key with exposure in years, claim counts and first/last months as 'YYYY-MM'."""
+        if self._table is None:
+            return pd.DataFrame()
+        table = self._table.copy()
+        if self._months is not None:
+            distinct = self._months.groupby(self.config.key, sort=False)['claim_months'].agg(['size', 'sum'])
+            table['earned_months'] = table[self.config.key].map(distinct['size']).to_numpy()
+            table['claim_months'] = table[self.config.key].map(distinct['sum']).to_numpy()
+        for col in ['first_month', 'last_month']:
+            months = table[col].to_numpy()
+            table[col] = [f'{m // 12:04d}-{m % 12 + 1:02d}' for m in months]
+        table['exposure_years'] = table['earned_months'] / 12
+        table['has_claim'] = (table['claim_months'] > 0).astype(int)
+        return table
+
+
+def build_policy_table(path: Union[str, Path], config: Optional[RollupConfig] = None,
+                       output_path: Optional[Union[str, Path]] = None) -> pd.DataFrame:
+    """Stream `path` through PolicyRollup and optionally write the table to Parquet."""
+    rollup = PolicyRollup(config)
+    columns = list(dict.fromkeys([rollup.config.key, rollup.config.date_column, rollup.config.premium_column,
+                                  rollup.config.claim_column] + rollup.config.attributes))
+    for chunk in iter_chunks(path, chunksize=rollup.config.chunksize, columns=columns):
+        rollup.partial_fit(chunk)
+    table = rollup.table()
+    if output_path is not None:
+        table.to_parquet(output_path, index=False)
+    return table
+
+
+def claim_frequency(table: pd.DataFrame, by: Optional[List[str]] = None) -> Union[float, pd.Series]:
+    """Claims per policy-year of exposure (claim months / exposure years), optionally by segment."""
+    if not by:
+        return table['claim_months'].sum() / table['exposure_years'].sum()
+    grouped = table.groupby(by)
+    return grouped['claim_months'].sum() / grouped['exposure_years'].sum()
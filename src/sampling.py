@@ -0,0 +1,131 @@
+"""
+One-pass stratified reservoir sampling over the raw or processed data files.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import pandas as pd
+import numpy as np
+
+from src.data_loader import iter_chunks, DEFAULT_CHUNKSIZE
+from src.models import RANDOM_STATE
+
+# ========== Constants ==========
+SAMPLE_KEY_COLUMN = '_sample_key'
+WEIGHT_COLUMN = 'SampleWeight'
+DEFAULT_STRATA = ['Province', 'HasClaim']
+# ================================
+
+
+@dataclass
+class SamplerConfig:
+    """Configuration for stratified reservoir sampling."""
+    n_per_stratum: int = 1000
+    strata: List[str] = field(default_factory=lambda: list(DEFAULT_STRATA))
+    claim_oversample: float = 1.0
+    claim_column: str = 'TotalClaims'
+    has_claim_column: str = 'HasClaim'
+    chunksize: int = DEFAULT_CHUNKSIZE
+    random_state: int = RANDOM_STATE
+
+
+def add_has_claim(df: pd.DataFrame, config: SamplerConfig) -> pd.DataFrame:
+    """Derive the binary claim flag from the claim amount if it is missing."""
+    if config.has_claim_column in df.columns:
+        return df
+    return df.assign(**{config.has_claim_column: (df[config.claim_column] > 0).astype(int)})
+
+
+class StratifiedReservoirSampler:
+    """
+    Streaming stratified sampler with a bounded reservoir per stratum.
+
+    Every row gets a uniform random key and each stratum keeps the rows with the
+    smallest keys (bottom-k sampling), which is a uniform sample without replacement
+    within the stratum. Claim strata can be given a larger reservoir through
+    `claim_oversample`; the per-stratum inclusion weight N_h / n_h keeps weighted
+    totals unbiased. Memory is proportional to the sample plus one chunk.
+    """
+
+    def __init__(self, config: SamplerConfig):
+        self.config = config
+        self._rng = np.random.default_rng(config.random_state)
+        self._reservoir: Optional[pd.DataFrame] = None
+        self._rows_seen = 0
+        self.stratum_counts: Dict[Tuple, int] = {}
+
+    def _capacity(self, df: pd.DataFrame) -> np.ndarray:
+        """Reservoir size for the stratum of each row."""
+        base = self.config.n_per_stratum
+        if self.config.has_claim_column not in self.config.strata:
+            return np.full(len(df), base)
+        claim_capacity = max(1, int(round(base * self.config.claim_oversample)))
+        return np.where(df[self.config.has_claim_column].to_numpy() == 1, claim_capacity, base)
+
+    def partial_fit(self, chunk: pd.DataFrame) -> 'StratifiedReservoirSampler':
+        """Update the reservoirs with the next chunk of rows."""
+        strata = self.config.strata
+        chunk = add_has_claim(chunk, self.config)
+        chunk = chunk.set_axis(pd.RangeIndex(self._rows_seen, self._rows_seen + len(chunk)))
+        chunk[SAMPLE_KEY_COLUMN] = self._rng.random(len(chunk))
+        self._rows_seen += len(chunk)
+
+        for key, n in chunk.groupby(strata, dropna=False, sort=False).size().items():
+            key = key if isinstance(key, tuple) else (key,)
+            self.stratum_counts[key] = self.stratum_counts.get(key, 0) + int(n)
+
+        combined = chunk if self._reservoir is None else pd.concat([self._reservoir, chunk])
+        combined = combined.sort_values(SAMPLE_KEY_COLUMN, kind='stable')
+        rank = combined.groupby(strata, dropna=False, sort=False).cumcount().to_numpy()
+        self._reservoir = combined[rank < self._capacity(combined)]
+        return self
+
+    def sample(self) -> pd.DataFrame:
+        """Return the current sample in file order with its inclusion weights."""
+        if self._reservoir is None:
+            return pd.DataFrame()
+        strata = self.config.strata
+        sample = self._reservoir.drop(columns=SAMPLE_KEY_COLUMN).sort_index()
+        population = pd.DataFrame(
+            [key + (n,) for key, n in self.stratum_counts.items()],
+            columns=strata + ['_population']
+        )
+        kept = sample.groupby(strata, dropna=False).size().rename('_kept').reset_index()
+        weights = population.merge(kept, on=strata, how='inner')
+        weights[WEIGHT_COLUMN] = weights['_population'] / weights['_kept']
+        weighted = sample.reset_index().merge(weights[strata + [WEIGHT_COLUMN]], on=strata, how='left')
+        return weighted.set_index('index').rename_axis(None)
+
+
+def weighted_describe(values: pd.Series, weights: pd.Series) -> pd.Series:
+    """Like Series.describe(), but estimated for the full book from a weighted sample."""
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    present = ~np.isnan(values)
+    values, weights = values[present], weights[present]
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(weights[order]) / weights.sum()
+    mean = np.average(values, weights=weights)
+    quantiles = {
+        label: values[order][min(np.searchsorted(cumulative, q), len(values) - 1)]
+        for label, q in [('25%', 0.25), ('50%', 0.5), ('75%', 0.75)]
+    }
+    return pd.Series({
+        'count': weights.sum(),
+        'mean': mean,
+        'std': np.sqrt(np.average((values - mean) ** 2, weights=weights)),
+        'min': values.min(),
+        **quantiles,
+        'max': values.max()
+    })
+
+
+def stratified_sample(path: Union[str, Path],
+                      config: Optional[SamplerConfig] = None,
+                      columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Draw a reproducible stratified sample from `path` in a single streaming pass."""
+    config = config or SamplerConfig()
+    sampler = StratifiedReservoirSampler(config)
+    for chunk in iter_chunks(path, chunksize=config.chunksize, columns=columns):
+        sampler.partial_fit(chunk)
+    return sampler.sample()
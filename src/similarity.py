@@ -0,0 +1,154 @@
+"""
+Nearest-neighbour lookup of similar historical policies for underwriting quotes.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import pandas as pd
+import numpy as np
+import joblib
+
+from src.models import DataPreprocessor
+
+# ========== Constants ==========
+DEFAULT_MATCH_ON = ['PostalCode']
+DEFAULT_OUTCOMES = ['TotalClaims']
+CATEGORY_MISMATCH_WEIGHT = 1.0
+ARRAY_FILES = ('numeric', 'codes', 'partition_keys', 'offsets', 'outcomes', 'row_ids')
+META_FILE = 'meta.json'
+PREPROCESSOR_FILE = 'preprocessor.joblib'
+# ================================
+
+
+class SimilarPolicyIndex:
+    """
+    Exact-match partitions over the DataPreprocessor feature space of the historical book.
+
+    Rows are grouped by the encoded values of the `match_on` categoricals (e.g.
+    PostalCode) and stored contiguously, so a quote only scans its own partition:
+    a binary search over partition keys, then a vectorized distance over that slice.
+    Distance is Euclidean on the scaled numerical features plus `category_weight`
+    per mismatched remaining categorical. Quotes whose partition holds fewer than k
+    policies fall back to scanning the whole book.
+
+    All arrays are saved as .npy files and loaded with mmap_mode='r', so several
+    processes (dashboard, scoring service) share one copy through the page cache.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any], preprocessor: DataPreprocessor):
+        self.arrays = arrays
+        self.meta = meta
+        self.preprocessor = preprocessor
+
+    @staticmethod
+    def _partition_keys(codes: np.ndarray, match_idx: List[int], match_dims: List[int]) -> np.ndarray:
+        """Combine the match-on category codes (unknown = -1) into one int64 key per row."""
+        if not match_idx:
+            return np.zeros(len(codes), dtype=np.int64)
+        shifted = [codes[:, i].astype(np.int64) + 1 for i in match_idx]
+        return np.ravel_multi_index(shifted, [d + 1 for d in match_dims])
+
+    def _encode(self, X: pd.DataFrame):
+        """Split preprocessed rows into scaled numerical features and categorical codes."""
+        X_proc = self.preprocessor.transform(X)
+        n_num = len(self.meta['numerical_features'])
+        # OrdinalEncoder passes missing categories through as NaN: treat them as unknown (-1)
+        codes = np.nan_to_num(X_proc[:, n_num:], nan=-1)
+        return X_proc[:, :n_num].astype(np.float32), codes.astype(np.int32)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, preprocessor: DataPreprocessor,
+              match_on: Optional[List[str]] = None,
+              outcome_columns: Optional[List[str]] = None,
+              id_column: Optional[str] = None,
+              category_weight: float = CATEGORY_MISMATCH_WEIGHT) -> 'SimilarPolicyIndex':
+        """
+        Index `df` with an already fitted preprocessor (e.g. RiskModel.preprocessor).
+
+        `df` should hold one row per policy (e.g. the src.rollup policy table), not
+        cover × month transactions, or the neighbours of a quote are one cover
+        repeated; with `id_column` duplicate ids are rejected.
+        """
+        if id_column and df[id_column].duplicated().any():
+            raise ValueError(f"{id_column} is not unique; roll transactions up to one row per policy first")
+        config = preprocessor.config
+        match_on = DEFAULT_MATCH_ON if match_on is None else match_on
+        outcome_columns = DEFAULT_OUTCOMES if outcome_columns is None else outcome_columns
+        vocabulary = preprocessor.fitted_categories()
+        match_idx = [config.categorical_features.index(col) for col in match_on]
+        meta = {
+            'numerical_features': config.numerical_features,
+            'categorical_features': config.categorical_features,
+            'match_on': match_on,
+            'match_idx': match_idx,
+            'match_dims': [len(vocabulary[col]) for col in match_on],
+            'outcome_columns': outcome_columns,
+            'category_weight': category_weight
+        }
+        index = cls({}, meta, preprocessor)
+
+        numeric, codes = index._encode(df[config.numerical_features + config.categorical_features])
+        keys = cls._partition_keys(codes, match_idx, meta['match_dims'])
+        order = np.argsort(keys, kind='stable')
+        partition_keys, starts = np.unique(keys[order], return_index=True)
+        row_ids = df[id_column].to_numpy() if id_column else np.arange(len(df))
+        index.arrays = {
+            'numeric': numeric[order],
+            'codes': codes[order],
+            'partition_keys': partition_keys,
+            'offsets': np.append(starts, len(order)).astype(np.int64),
+            'outcomes': df[outcome_columns].to_numpy(dtype=np.float64)[order],
+            'row_ids': np.asarray(row_ids, dtype=np.int64)[order]
+        }
+        return index
+
+    def save(self, directory: Union[str, Path]) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(directory / f'{name}.npy', self.arrays[name])
+        with open(directory / META_FILE, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        joblib.dump(self.preprocessor, directory / PREPROCESSOR_FILE)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> 'SimilarPolicyIndex':
+        directory = Path(directory)
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(directory / f'{name}.npy', mmap_mode=mmap_mode) for name in ARRAY_FILES}
+        with open(directory / META_FILE, 'r') as f:
+            meta = json.load(f)
+        return cls(arrays, meta, joblib.load(directory / PREPROCESSOR_FILE))
+
+    def _candidates(self, key: int, k: int) -> slice:
+        """Row range of the quote's partition, or the whole book if it is too small."""
+        keys, offsets = self.arrays['partition_keys'], self.arrays['offsets']
+        pos = int(np.searchsorted(keys, key))
+        if pos < len(keys) and keys[pos] == key and offsets[pos + 1] - offsets[pos] >= k:
+            return slice(int(offsets[pos]), int(offsets[pos + 1]))
+        return slice(0, int(offsets[-1]))
+
+    def query(self, X: pd.DataFrame, k: int = 10) -> pd.DataFrame:
+        """Return the k most similar historical policies, with outcomes, for every quote row."""
+        meta = self.meta
+        numeric, codes = self._encode(X[meta['numerical_features'] + meta['categorical_features']])
+        keys = self._partition_keys(codes, meta['match_idx'], meta['match_dims'])
+        other_cats = [i for i in range(codes.shape[1]) if i not in meta['match_idx']]
+        results = []
+        for q in range(len(X)):
+            rows = self._candidates(int(keys[q]), k)
+            diff = np.asarray(self.arrays['numeric'][rows]) - numeric[q]
+            distance = np.sqrt((diff * diff).sum(axis=1))
+            if other_cats:
+                mismatches = (np.asarray(self.arrays['codes'][rows][:, other_cats]) != codes[q, other_cats]).sum(axis=1)
+                distance = distance + meta['category_weight'] * mismatches
+            n = min(k, len(distance))
+            nearest = np.argpartition(distance, n - 1)[:n]
+            nearest = nearest[np.argsort(distance[nearest], kind='stable')]
+            hits = pd.DataFrame(self.arrays['outcomes'][rows][nearest], columns=meta['outcome_columns'])
+            hits.insert(0, 'query', X.index[q])
+            hits.insert(1, 'rank', np.arange(1, n + 1))
+            hits.insert(2, 'row_id', self.arrays['row_ids'][rows][nearest])
+            hits.insert(3, 'distance', distance[nearest])
+            results.append(hits)
+        return pd.concat(results, ignore_index=True)
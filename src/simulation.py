@@ -0,0 +1,221 @@
+"""
+Monte Carlo simulation of aggregate portfolio losses (VaR / TVaR by segment).
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.models import RANDOM_STATE, RiskModel
+
+# ========== Constants ==========
+SEVERITY_DISTRIBUTIONS = ('lognormal', 'pareto')
+RISK_LEVELS = (0.95, 0.99, 0.995)
+TOTAL_SEGMENT = 'Total'
+# ================================
+
+
+@dataclass
+class SimulationConfig:
+    """Configuration for the aggregate-loss simulator."""
+    n_scenarios: int = 10_000
+    scenarios_per_block: int = 1_000
+    severity: str = 'lognormal'
+    # Lognormal log-scale sigma; larger = heavier tail. The mean is kept at the model's severity.
+    lognormal_sigma: float = 1.5
+    # Pareto (Lomax) tail index; must be > 1 for a finite mean.
+    pareto_shape: float = 2.5
+    n_jobs: int = 1
+    random_state: int = RANDOM_STATE
+    # Relative accuracy of the quantile sketches.
+    relative_accuracy: float = 0.01
+    max_loss: float = 1e13
+
+
+class QuantileSketch:
+    """
+    Mergeable log-bucket histogram with bounded relative error on quantiles.
+
+    Values fall into geometric buckets [gamma^(i-1), gamma^i) with
+    gamma = (1 + a) / (1 - a), so any quantile is returned within relative error
+    `a`; losses below 1 go to a zero bucket. Memory is a fixed array of counts and
+    sketches merge by adding counts, so simulated paths never need to be kept.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_value: float = 1e13):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.n_buckets = int(np.ceil(np.log(max_value) / np.log(self.gamma))) + 2
+        self.counts = np.zeros(self.n_buckets, dtype=np.int64)
+        self.total = 0.0
+
+    def _bucket(self, values: np.ndarray) -> np.ndarray:
+        buckets = np.zeros(len(values), dtype=np.int64)
+        positive = values >= 1
+        buckets[positive] = np.ceil(np.log(values[positive]) / np.log(self.gamma)).astype(np.int64) + 1
+        return np.minimum(buckets, self.n_buckets - 1)
+
+    def _representatives(self) -> np.ndarray:
+        i = np.arange(self.n_buckets) - 1
+        values = 2 * self.gamma ** i / (self.gamma + 1)
+        values[0] = 0.0
+        return values
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        self.counts += np.bincount(self._bucket(values), minlength=self.n_buckets)
+        self.total += float(values.sum())
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def quantile(self, q: float) -> float:
+        """Value at risk: the q-quantile of the sketched distribution."""
+        rank = q * (self.count - 1)
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        return float(self._representatives()[bucket])
+
+    def tail_mean(self, q: float) -> float:
+        """Tail value at risk: mean of the worst (1 - q) share of outcomes."""
+        cumulative = np.cumsum(self.counts)
+        tail = self.count - q * self.count
+        # Count of each bucket that lies in the tail, filling from the top down
+        above = np.clip(cumulative - q * self.count, 0, self.counts)
+        return float((above * self._representatives()).sum() / tail)
+
+
+def _draw_severities(rng: np.random.Generator, means: np.ndarray, config: SimulationConfig) -> np.ndarray:
+    """Heavy-tailed claim amounts with the given per-claim means."""
+    if config.severity == 'lognormal':
+        sigma = config.lognormal_sigma
+        return rng.lognormal(np.log(means) - sigma ** 2 / 2, sigma)
+    shape = config.pareto_shape
+    return rng.pareto(shape, len(means)) * means * (shape - 1)
+
+
+def _simulate_block(seed: np.random.SeedSequence, n_scenarios: int, claim_prob: np.ndarray,
+                    severity_mean: np.ndarray, segment_codes: np.ndarray, n_segments: int,
+                    config: SimulationConfig) -> List[QuantileSketch]:
+    """
+    Simulate one block of scenarios and return one sketch per segment plus the total.
+
+    Claims are drawn sparsely: for each policy the number of scenarios with a claim
+    is Binomial(n_scenarios, p) and those scenarios are a uniform subset (colliding
+    draws are redrawn), which is exactly n_scenarios independent Bernoulli draws
+    without materialising the scenarios × policies matrix.
+    """
+    rng = np.random.default_rng(seed)
+    n_claims = rng.binomial(n_scenarios, claim_prob)
+    policy = np.repeat(np.arange(len(claim_prob)), n_claims)
+    scenario = rng.integers(0, n_scenarios, len(policy))
+    # Collisions only happen within a policy, so later passes re-check only the
+    # policies that still had one (cheap even when p is large)
+    rows = np.arange(len(policy))
+    while True:
+        key = policy[rows].astype(np.int64) * n_scenarios + scenario[rows]
+        order = np.argsort(key, kind='stable')
+        duplicate = np.zeros(len(key), dtype=bool)
+        duplicate[order[1:]] = key[order[1:]] == key[order[:-1]]
+        if not duplicate.any():
+            break
+        redraw = rows[duplicate]
+        scenario[redraw] = rng.integers(0, n_scenarios, len(redraw))
+        rows = rows[np.isin(policy[rows], policy[redraw])]
+
+    amounts = _draw_severities(rng, severity_mean[policy], config)
+    cell = scenario * n_segments + segment_codes[policy]
+    losses = np.bincount(cell, weights=amounts, minlength=n_scenarios * n_segments).reshape(n_scenarios, n_segments)
+
+    sketches = []
+    for column in list(losses.T) + [losses.sum(axis=1)]:
+        sketch = QuantileSketch(config.relative_accuracy, config.max_loss)
+        sketch.add(column)
+        sketches.append(sketch)
+    return sketches
+
+
+def simulate_aggregate_losses(claim_prob: np.ndarray, severity_mean: np.ndarray,
+                              segments: Sequence, config: Optional[SimulationConfig] = None) -> Dict[str, QuantileSketch]:
+    """
+    Simulate total losses per segment (e.g. Province) and for the whole portfolio.
+
+    `claim_prob` and `severity_mean` are per-policy model outputs: probability of a
+    claim and expected amount *given a claim*, not the unconditional expected loss
+    (use risk_model_inputs for a RiskModel). Scenario blocks get independent child
+    seeds of `random_state` and run in parallel with joblib when `n_jobs` != 1, so
+    results are reproducible for a given block size. Returns a sketch per segment
+    with an extra 'Total' entry.
+    """
+    config = config or SimulationConfig()
+    if config.severity not in SEVERITY_DISTRIBUTIONS:
+        raise ValueError(f"severity must be one of {SEVERITY_DISTRIBUTIONS}, got {config.severity!r}")
+    claim_prob = np.clip(np.asarray(claim_prob, dtype=float), 0, 1)
+    severity_mean = np.asarray(severity_mean, dtype=float)
+    # Policies with no expected severity cannot produce a loss.
+    claim_prob = np.where(severity_mean > 0, claim_prob, 0.0)
+    severity_mean = np.where(severity_mean > 0, severity_mean, 1.0)
+    segment_codes, segment_names = pd.factorize(pd.Series(segments), sort=True)
+
+    block_sizes = [config.scenarios_per_block] * (config.n_scenarios // config.scenarios_per_block)
+    if config.n_scenarios % config.scenarios_per_block:
+        block_sizes.append(config.n_scenarios % config.scenarios_per_block)
+    seeds = np.random.SeedSequence(config.random_state).spawn(len(block_sizes))
+
+    blocks = Parallel(n_jobs=config.n_jobs)(
+        delayed(_simulate_block)(seed, size, claim_prob, severity_mean, segment_codes, len(segment_names), config)
+        for seed, size in zip(seeds, block_sizes)
+    )
+    merged = blocks[0]
+    for block in blocks[1:]:
+        for sketch, other in zip(merged, block):
+            sketch.merge(other)
+    return dict(zip([str(name) for name in segment_names] + [TOTAL_SEGMENT], merged))
+
+
+def severity_from_expected_loss(claim_prob: np.ndarray, expected_loss: np.ndarray) -> np.ndarray:
+    """
+    Convert an unconditional expected loss E[L] into the mean amount given a claim.
+
+    E[L] = p * E[L | claim], so the severity is E[L] / p; policies with p = 0 get
+    severity 0 (they are never simulated to claim).
+    """
+    claim_prob = np.asarray(claim_prob, dtype=float)
+    expected_loss = np.clip(np.asarray(expected_loss, dtype=float), 0, None)
+    return np.divide(expected_loss, claim_prob, out=np.zeros_like(expected_loss), where=claim_prob > 0)
+
+
+def risk_model_inputs(model: RiskModel, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-policy (claim_prob, severity_mean) for simulate_aggregate_losses from a two-stage RiskModel.
+
+    RiskModel.reg is trained on TotalClaims over every row, so it predicts the
+    unconditional expected loss; it is divided by the claim probability here.
+    Passing it straight in as the severity would simulate p² × severity. The mean
+    is right for any classifier, but the spread needs calibrated probabilities:
+    class_weight='balanced' inflates p, giving more, smaller claims and thin tails.
+    """
+    if model.config.mode != 'two_stage':
+        raise ValueError("risk_model_inputs needs a two_stage model; a Tweedie pure premium has no claim probability")
+    claim_prob = model.predict_claim_proba(model.preprocessor.transform(X))
+    return claim_prob, severity_from_expected_loss(claim_prob, model.predict_expected_loss(X))
+
+
+def risk_capital_summary(sketches: Dict[str, QuantileSketch], levels: Sequence[float] = RISK_LEVELS) -> pd.DataFrame:
+    """Expected loss, VaR and TVaR at each level, one row per segment."""
+    rows = []
+    for segment, sketch in sketches.items():
+        row = {'segment': segment, 'expected_loss': sketch.mean()}
+        for level in levels:
+            row[f'VaR_{level}'] = sketch.quantile(level)
+            row[f'TVaR_{level}'] = sketch.tail_mean(level)
+        rows.append(row)
+    return pd.DataFrame(rows)
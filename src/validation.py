@@ -0,0 +1,170 @@
+"""
+Declarative, vectorized data validation for ingest chunks and scoring inputs.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from src.models import ModelConfig
+
+# ========== Constants ==========
+MAX_SAMPLE_INDICES = 5
+DTYPES = ('numeric', 'categorical', 'datetime')
+PROVINCES = [
+    'Eastern Cape', 'Free State', 'Gauteng', 'KwaZulu-Natal', 'Limpopo',
+    'Mpumalanga', 'North West', 'Northern Cape', 'Western Cape'
+]
+# ================================
+
+
+class DataValidationError(ValueError):
+    """Raised when inputs violate a schema; carries the violation report."""
+
+    def __init__(self, report: 'ViolationReport'):
+        self.report = report
+        super().__init__(f"{report.total} schema violation(s):\n{report.to_frame().to_string(index=False)}")
+
+
+@dataclass
+class ColumnRule:
+    """Type, range, category and nullability constraints for one column."""
+    name: str
+    dtype: str = 'numeric'
+    nullable: bool = True
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    allowed: Optional[List[Any]] = None
+
+
+@dataclass
+class Schema:
+    """A set of column rules checked together."""
+    columns: List[ColumnRule]
+
+    def __post_init__(self):
+        for rule in self.columns:
+            if rule.dtype not in DTYPES:
+                raise ValueError(f"{rule.name}: dtype must be one of {DTYPES}, got {rule.dtype!r}")
+
+
+@dataclass
+class ViolationReport:
+    """Violation counts per (column, check) with a few sample row indices each."""
+    max_samples: int = MAX_SAMPLE_INDICES
+    rows_checked: int = 0
+    counts: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    samples: Dict[Tuple[str, str], List[Any]] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def ok(self) -> bool:
+        return self.total == 0
+
+    def add(self, column: str, check: str, index: pd.Index, mask: np.ndarray) -> None:
+        n = int(mask.sum())
+        if n == 0:
+            return
+        key = (column, check)
+        self.counts[key] = self.counts.get(key, 0) + n
+        samples = self.samples.setdefault(key, [])
+        if len(samples) < self.max_samples:
+            samples.extend(index[mask][:self.max_samples - len(samples)].tolist())
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(col, check, n, self.samples[(col, check)]) for (col, check), n in self.counts.items()],
+            columns=['column', 'check', 'count', 'sample_rows']
+        )
+
+
+def validate_rows(df: pd.DataFrame, schema: Schema, report: Optional[ViolationReport] = None) -> np.ndarray:
+    """
+    Check one chunk against `schema` and return the mask of rows that fail any rule.
+
+    Every check is a single vectorized pass over a column. Violations accumulate into
+    `report`, whose `rows_checked` is the running row offset: sample rows are
+    positions in the stream of chunks checked so far (file rows for one file read
+    in order), whatever the chunk's own index is.
+    """
+    report = report if report is not None else ViolationReport()
+    positions = pd.RangeIndex(report.rows_checked, report.rows_checked + len(df))
+    report.rows_checked += len(df)
+    invalid = np.zeros(len(df), dtype=bool)
+
+    def add(column: str, check: str, mask: np.ndarray) -> None:
+        nonlocal invalid
+        invalid |= mask
+        report.add(column, check, positions, mask)
+
+    for rule in schema.columns:
+        if rule.name not in df.columns:
+            # Every row is unusable, but the column is reported once per chunk
+            invalid[:] = True
+            report.add(rule.name, 'missing_column', positions[:1], np.ones(min(len(df), 1), dtype=bool))
+            continue
+        values = df[rule.name]
+        present = values.notna().to_numpy()
+        if not rule.nullable:
+            add(rule.name, 'null', ~present)
+
+        if rule.dtype == 'numeric':
+            parsed = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors='coerce')
+        elif rule.dtype == 'datetime':
+            parsed = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+        else:
+            parsed = values
+        if rule.dtype != 'categorical':
+            parsed_ok = parsed.notna().to_numpy()
+            add(rule.name, f'not_{rule.dtype}', present & ~parsed_ok)
+            if rule.min_value is not None:
+                add(rule.name, 'below_min', parsed_ok & (parsed < rule.min_value).to_numpy())
+            if rule.max_value is not None:
+                add(rule.name, 'above_max', parsed_ok & (parsed > rule.max_value).to_numpy())
+
+        if rule.allowed is not None:
+            add(rule.name, 'unknown_category', present & ~values.isin(rule.allowed).to_numpy())
+    return invalid
+
+
+def validate(df: pd.DataFrame, schema: Schema, report: Optional[ViolationReport] = None) -> ViolationReport:
+    """Check one chunk against `schema`, accumulating into `report` (see validate_rows)."""
+    report = report if report is not None else ViolationReport()
+    validate_rows(df, schema, report)
+    return report
+
+
+def ingest_schema() -> Schema:
+    """Rules for raw transaction rows, following the cleaning steps documented in EDA."""
+    return Schema([
+        ColumnRule('UnderwrittenCoverID', 'numeric', nullable=False),
+        ColumnRule('PolicyID', 'numeric', nullable=False),
+        ColumnRule('TransactionMonth', 'datetime', nullable=False),
+        ColumnRule('Province', 'categorical', nullable=False, allowed=PROVINCES),
+        ColumnRule('PostalCode', 'numeric', nullable=False),
+        ColumnRule('RegistrationYear', 'numeric', min_value=1900, max_value=datetime.now().year),
+        ColumnRule('CustomValueEstimate', 'numeric', min_value=0),
+        ColumnRule('SumInsured', 'numeric', min_value=0),
+        ColumnRule('TotalPremium', 'numeric', nullable=False),
+        ColumnRule('TotalClaims', 'numeric', nullable=False)
+    ])
+
+
+def scoring_schema(config: ModelConfig, categories: Optional[Dict[str, List[Any]]] = None) -> Schema:
+    """
+    Rules for RiskModel inputs: every feature present, numerical features numeric,
+    categorical features limited to the model vocabulary (`categories`, defaulting to
+    config.categories) instead of being silently encoded as unknown.
+    """
+    categories = categories if categories is not None else (config.categories or {})
+    rules = []
+    for col in config.numerical_features:
+        max_value = datetime.now().year if col == 'RegistrationYear' else None
+        rules.append(ColumnRule(col, 'numeric', nullable=False, max_value=max_value))
+    for col in config.categorical_features:
+        rules.append(ColumnRule(col, 'categorical', allowed=categories.get(col)))
+    return Schema(rules)
@@ -0,0 +1,82 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.models import ModelConfig
+from src.backtest import BacktestConfig, rolling_origin_folds, run_backtest
+
+@pytest.fixture
+def monthly_book():
+    """Synthetic book spread over 10 transaction months."""
+    rng = np.random.default_rng(3)
+    n = 6000
+    sum_insured = rng.normal(0, 1, n)
+    has_claim = (rng.random(n) < 1 / (1 + np.exp(-(-2.5 + sum_insured)))).astype(int)
+    return pd.DataFrame({
+        'TransactionMonth': pd.to_datetime('2014-02-01') + pd.to_timedelta(rng.integers(0, 10, n) * 31, unit='D'),
+        'VehicleType': rng.choice(['SUV', 'Sedan', 'Truck'], n),
+        'SumInsured': sum_insured,
+        'TotalPremium': rng.uniform(50, 500, n),
+        'TotalClaims': has_claim * rng.gamma(2.0, 5000.0, n)
+    })
+
+@pytest.fixture
+def backtest_model_config():
+    return ModelConfig(categorical_features=['VehicleType'], numerical_features=['SumInsured'])
+
+def test_folds_never_look_ahead():
+    months = list(pd.period_range('2014-02', periods=8, freq='M'))
+    expanding = rolling_origin_folds(months, BacktestConfig(min_train_months=5))
+    assert len(expanding) == 3
+    for train, test in expanding:
+        assert train[0] == months[0]
+        assert max(train) < min(test)
+    sliding = rolling_origin_folds(months, BacktestConfig(window='sliding', min_train_months=5, train_months=3))
+    assert all(len(train) == 3 for train, _ in sliding)
+
+def test_run_backtest_reports_per_fold(monthly_book, backtest_model_config):
+    report = run_backtest(monthly_book, backtest_model_config, BacktestConfig(min_train_months=6))
+    assert len(report) == 4
+    for col in ['auc', 'calibration_ratio', 'actual_loss_ratio', 'predicted_loss_ratio', 'fit_seconds']:
+        assert report[col].notna().all()
+    assert (report['auc'] > 0.6).all()
+
+def test_parallel_backtest_matches_sequential(monthly_book, backtest_model_config):
+    sequential = run_backtest(monthly_book, backtest_model_config,
+                              BacktestConfig(min_train_months=7, warm_start=False))
+    parallel = run_backtest(monthly_book, backtest_model_config,
+                            BacktestConfig(min_train_months=7, n_jobs=2))
+    pd.testing.assert_series_equal(sequential['auc'], parallel['auc'])
+
+def test_xgboost_folds_do_not_continue_boosting(monthly_book, backtest_model_config):
+    pytest.importorskip("xgboost")
+    backtest_model_config.backend = 'xgboost'
+    backtest_model_config.backend_params = {'num_boost_round': 20, 'early_stopping_rounds': None}
+    warm = run_backtest(monthly_book, backtest_model_config, BacktestConfig(min_train_months=8))
+    cold = run_backtest(monthly_book, backtest_model_config, BacktestConfig(min_train_months=8, warm_start=False))
+    pd.testing.assert_series_equal(warm['auc'], cold['auc'])
+
+def test_tweedie_backtest_uses_pure_premium(monthly_book, backtest_model_config):
+    backtest_model_config.mode = 'tweedie'
+    report = run_backtest(monthly_book, backtest_model_config, BacktestConfig(min_train_months=7))
+    assert (report['auc'] > 0.6).all()
+    assert report['predicted_loss_ratio'].notna().all()
+    assert report['calibration_ratio'].isna().all()
+    backtest_model_config.mode = 'frequency'
+    with pytest.raises(ValueError):
+        run_backtest(monthly_book, backtest_model_config)
+
+def test_predicted_loss_ratio_tracks_actual(monthly_book, backtest_model_config):
+    two_stage = run_backtest(monthly_book, backtest_model_config, BacktestConfig(min_train_months=7))
+    backtest_model_config.mode = 'tweedie'
+    tweedie = run_backtest(monthly_book, backtest_model_config, BacktestConfig(min_train_months=7))
+    for report in (two_stage, tweedie):
+        ratio = report['predicted_loss_ratio'] / report['actual_loss_ratio']
+        assert ((ratio > 0.7) & (ratio < 1.4)).all()
+
+def test_tweedie_fold_without_claims_has_nan_auc(monthly_book, backtest_model_config):
+    months = pd.to_datetime(monthly_book['TransactionMonth']).dt.to_period('M')
+    book = monthly_book.copy()
+    book.loc[months == months.max(), 'TotalClaims'] = 0.0
+    backtest_model_config.mode = 'tweedie'
+    report = run_backtest(book, backtest_model_config, BacktestConfig(min_train_months=9))
+    assert len(report) == 1 and np.isnan(report['auc'].iloc[0])
@@ -0,0 +1,113 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.ingestion import IngestionConfig, SegmentAggregates, Watermark, ingest, WATERMARK_FILE
+from src.validation import ingest_schema
+
+def make_drop(months, n=400, seed=0):
+    """One monthly drop file's worth of transactions."""
+    rng = np.random.default_rng(seed)
+    claims = np.where(rng.random(n) < 0.1, rng.gamma(2.0, 5000.0, n), 0.0)
+    return pd.DataFrame({
+        'TransactionMonth': rng.choice(months, n),
+        'Province': rng.choice(['Gauteng', 'Limpopo'], n),
+        'TotalPremium': rng.uniform(50, 500, n),
+        'TotalClaims': claims
+    })
+
+@pytest.fixture
+def ingest_config(tmp_path):
+    return IngestionConfig(dataset_dir=str(tmp_path / "transactions"), chunksize=150)
+
+def test_incremental_aggregates_match_full_recompute(tmp_path, ingest_config):
+    drops = [make_drop(['2015-01-01'], seed=1), make_drop(['2015-02-01', '2015-03-01'], seed=2)]
+    paths = []
+    for i, drop in enumerate(drops):
+        paths.append(tmp_path / f"drop{i}.txt")
+        drop.to_csv(paths[-1], sep='|', index=False)
+
+    assert ingest(paths[:1], ingest_config)['last_month'] == '2015-01'
+    summary = ingest(paths[1:], ingest_config)
+    assert summary['rows_appended'] == len(drops[1])
+    assert summary['last_month'] == '2015-03'
+
+    full = pd.concat(drops)
+    aggregates = SegmentAggregates.load(f"{ingest_config.dataset_dir}/_aggregates.parquet", ['Province'])
+    metrics = aggregates.metrics().set_index('Province')
+    expected = full.groupby('Province').apply(lambda g: g['TotalClaims'].sum() / g['TotalPremium'].sum())
+    pd.testing.assert_series_equal(metrics['loss_ratio'], expected, check_names=False)
+    assert len(pd.read_parquet(ingest_config.dataset_dir)) == len(full)
+
+def test_reingesting_same_file_is_a_no_op(tmp_path, ingest_config):
+    path = tmp_path / "drop.txt"
+    make_drop(['2015-01-01']).to_csv(path, sep='|', index=False)
+    ingest([path], ingest_config)
+    summary = ingest([path], ingest_config)
+    assert summary['files_skipped'] == 1
+    assert summary['rows_appended'] == 0
+    assert Watermark.load(f"{ingest_config.dataset_dir}/{WATERMARK_FILE}").rows == 400
+
+def test_rows_at_or_before_watermark_are_skipped(tmp_path, ingest_config):
+    first, late = tmp_path / "first.txt", tmp_path / "late.txt"
+    make_drop(['2015-02-01'], seed=1).to_csv(first, sep='|', index=False)
+    make_drop(['2015-01-01', '2015-03-01'], seed=2).to_csv(late, sep='|', index=False)
+    ingest([first], ingest_config)
+    summary = ingest([late], ingest_config)
+    assert summary['late_rows_skipped'] + summary['rows_appended'] == 400
+    assert summary['late_rows_skipped'] > 0
+
+def test_ingest_reports_schema_violations(tmp_path, ingest_config):
+    from src.validation import ColumnRule, Schema
+    path = tmp_path / "drop.txt"
+    drop = make_drop(['2015-01-01'])
+    drop.loc[[3, 7], 'Province'] = 'Atlantis'
+    drop.to_csv(path, sep='|', index=False)
+    ingest_config.schema = Schema([ColumnRule('Province', 'categorical', allowed=['Gauteng', 'Limpopo'])])
+    violations = ingest([path], ingest_config)['violations']
+    assert violations.rows_checked == len(drop)
+    assert violations.samples[('Province', 'unknown_category')] == [3, 7]
+
+def test_ingested_rows_are_cleaned_with_a_pinned_schema(tmp_path, ingest_config):
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    drop = make_drop(['2015-01-01'], seed=1).assign(SumInsured=np.nan, Bank='FNB')
+    drop.loc[:9, 'Bank'] = np.nan
+    drop.to_csv(first, sep='|', index=False)
+    # SumInsured is empty in the first drop and numeric in the next
+    make_drop(['2015-02-01'], seed=2).assign(SumInsured=5000.0, Bank='ABSA').to_csv(second, sep='|', index=False)
+    ingest_config.schema = ingest_schema()
+    ingest([first], ingest_config)
+    ingest([second], ingest_config)
+
+    stored = pd.read_parquet(ingest_config.dataset_dir)
+    assert len(stored) == 800
+    assert stored['SumInsured'].dtype == float
+    np.testing.assert_allclose(stored['AnnualPremium'], stored['TotalPremium'] * 12)
+    assert stored['Bank'].notna().all()
+    assert Watermark.load(f"{ingest_config.dataset_dir}/{WATERMARK_FILE}").fill_values['Bank'] == 'FNB'
+
+def test_restatements_of_watermark_month_are_counted(tmp_path, ingest_config):
+    first, restated = tmp_path / "first.txt", tmp_path / "restated.txt"
+    make_drop(['2015-02-01'], seed=1).to_csv(first, sep='|', index=False)
+    make_drop(['2015-01-01', '2015-02-01'], seed=2).to_csv(restated, sep='|', index=False)
+    ingest([first], ingest_config)
+    summary = ingest([restated], ingest_config)
+    assert summary['rows_appended'] == 0
+    assert summary['restated_rows_skipped'] > 0
+    assert summary['late_rows_skipped'] + summary['restated_rows_skipped'] == 400
+
+def test_rows_with_non_numeric_amounts_are_skipped(tmp_path, ingest_config):
+    path = tmp_path / "drop.txt"
+    drop = make_drop(['2015-01-01'])
+    drop['TotalPremium'] = drop['TotalPremium'].astype(object)
+    drop.loc[[0, 5], 'TotalPremium'] = 'abc'
+    drop.loc[9, 'TotalClaims'] = np.nan
+    drop.to_csv(path, sep='|', index=False)
+    ingest_config.schema = ingest_schema()
+    summary = ingest([path], ingest_config)
+    assert summary['invalid_rows_skipped'] == 3
+    assert summary['rows_appended'] == len(drop) - 3
+    assert summary['violations'].counts[('TotalPremium', 'not_numeric')] == 2
+    stored = pd.read_parquet(ingest_config.dataset_dir)
+    assert stored['TotalPremium'].dtype == float and len(stored) == len(drop) - 3
+    aggregates = SegmentAggregates.load(f"{ingest_config.dataset_dir}/_aggregates.parquet", ['Province'])
+    assert aggregates.sums['premium'].sum() == pytest.approx(stored['TotalPremium'].sum())
@@ -2,6 +2,7 @@ import pytest
 import pandas as pd
 import numpy as np
 from src.models import ModelConfig, DataPreprocessor, RiskModel
+from src.evaluation import calibration_report
 
 @pytest.fixture
 def sample_data():
@@ -75,4 +76,121 @@ def test_save_load_model(tmp_path, model_config, sample_data):
     # Check that loaded model can predict
     scores_loaded = loaded.predict_risk_score(X)
     scores_original = model.predict_risk_score(X)
-    np.testing.assert_array_almost_equal(scores_loaded, scores_original)
\ No newline at end of file
+    np.testing.assert_array_almost_equal(scores_loaded, scores_original)
+
+@pytest.fixture
+def rare_claim_data():
+    """Larger synthetic book with a ~2% claim rate driven by SumInsured and VehicleType."""
+    rng = np.random.default_rng(1)
+    n = 20000
+    vehicle = rng.choice(['SUV', 'Sedan', 'Truck'], n)
+    sum_insured = rng.normal(0, 1, n)
+    logit = -4.2 + 0.8 * sum_insured + np.where(vehicle == 'Truck', 0.7, 0.0)
+    has_claim = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    X = pd.DataFrame({
+        'PostalCode': rng.choice(['A1', 'B2', 'C3'], n),
+        'VehicleType': vehicle,
+        'SumInsured': sum_insured
+    })
+    return X, pd.Series(has_claim)
+
+@pytest.mark.parametrize("correction", ["offset", "weight"])
+def test_negative_downsampling_is_calibrated(model_config, rare_claim_data, correction):
+    X, y = rare_claim_data
+    model_config.negative_sample_rate = 0.1
+    model_config.downsample_correction = correction
+    model = RiskModel(model_config)
+    model.train_classifier(X, y)
+    proba = model.predict_claim_proba(model.preprocessor.transform(X))
+    report = calibration_report(y, proba)
+    assert report['calibration_ratio'] == pytest.approx(1.0, abs=0.15)
+    assert report['auc'] > 0.7
+
+def test_downsampled_model_scores_full_training_frame(model_config, rare_claim_data):
+    X, y = rare_claim_data
+    # Many rare postal codes: most only appear on rows the downsampling drops
+    X = X.assign(PostalCode=np.random.default_rng(2).integers(0, 2000, len(X)).astype(str))
+    model_config.negative_sample_rate = 0.05
+    model = RiskModel(model_config)
+    model.train_classifier(X, y)
+    model.train_regressor(X, y * 1000.0)
+    assert set(model.preprocessor.fitted_categories()['PostalCode']) == set(X['PostalCode'])
+    assert model.validate_inputs(X).ok
+    scores = model.predict_risk_score(X)
+    assert len(scores) == len(X) and np.isfinite(scores).all()
+
+def test_invalid_negative_sample_rate(model_config, sample_data):
+    model_config.negative_sample_rate = 0.0
+    model = RiskModel(model_config)
+    X = sample_data[model_config.categorical_features + model_config.numerical_features]
+    with pytest.raises(ValueError):
+        model.train_classifier(X, sample_data['HasClaim'])
+
+def test_xgboost_backend_save_load(tmp_path, model_config, rare_claim_data):
+    pytest.importorskip("xgboost")
+    X, y = rare_claim_data
+    model_config.backend = 'xgboost'
+    model_config.backend_params = {'num_boost_round': 50, 'max_depth': 3, 'nthread': 2}
+    model = RiskModel(model_config)
+    model.train_classifier(X, y)
+    model.train_regressor(X, y * 1000.0)
+    scores = model.predict_risk_score(X)
+    assert scores.shape == (len(X),)
+    path = tmp_path / "model.pkl"
+    model.save(path)
+    np.testing.assert_array_almost_equal(RiskModel.load(path).predict_risk_score(X), scores)
+
+def test_xgboost_backend_reuses_dmatrix(model_config, rare_claim_data):
+    pytest.importorskip("xgboost")
+    X, y = rare_claim_data
+    model_config.backend = 'xgboost'
+    model_config.backend_params = {'num_boost_round': 30, 'nthread': 2}
+    first = RiskModel(model_config)
+    first.train_classifier(X, y)
+    dtrain = first.build_dmatrix(X.iloc[:15000], y.iloc[:15000])
+    dvalid = first.build_dmatrix(X.iloc[15000:], y.iloc[15000:], ref=dtrain)
+    second = RiskModel(model_config)
+    second.train_classifier(X, y, dtrain=dtrain, dvalid=dvalid)
+    proba = second.predict_claim_proba(second.preprocessor.transform(X))
+    assert ((proba > 0) & (proba < 1)).all()
+
+@pytest.mark.parametrize("correction", ["offset", "weight"])
+def test_xgboost_dmatrix_with_negative_downsampling(model_config, rare_claim_data, correction):
+    pytest.importorskip("xgboost")
+    X, y = rare_claim_data
+    model_config.backend = 'xgboost'
+    model_config.backend_params = {'num_boost_round': 30, 'max_depth': 3, 'nthread': 2}
+    model_config.negative_sample_rate = 0.1
+    model_config.downsample_correction = correction
+    model = RiskModel(model_config)
+    model.preprocessor.fit_transform(X)
+    with pytest.raises(ValueError):
+        model.train_classifier(X, y, dtrain=model.build_dmatrix(X, y))
+    dtrain = model.build_dmatrix(X.iloc[:15000], y.iloc[:15000], downsample=True)
+    dvalid = model.build_dmatrix(X.iloc[15000:], y.iloc[15000:], ref=dtrain, downsample=True)
+    model.train_classifier(X, y, dtrain=dtrain, dvalid=dvalid)
+    proba = model.predict_claim_proba(model.preprocessor.transform(X))
+    assert calibration_report(y, proba)['calibration_ratio'] == pytest.approx(1.0, abs=0.2)
+
+def test_tweedie_pure_premium_mode(tmp_path, model_config, rare_claim_data):
+    X, y = rare_claim_data
+    claims = y * 1000.0
+    model_config.mode = 'tweedie'
+    model = RiskModel(model_config)
+    model.train_pure_premium(X, claims)
+    scores = model.predict_risk_score(X)
+    assert (scores > 0).all()
+    assert scores.mean() == pytest.approx(claims.mean(), rel=0.2)
+    np.testing.assert_allclose(model.predict_risk_score(X, exposure=np.full(len(X), 2.0)), 2 * scores)
+    path = tmp_path / "model.pkl"
+    model.save(path)
+    np.testing.assert_array_almost_equal(RiskModel.load(path).predict_risk_score(X), scores)
+
+def test_tweedie_with_exposure(model_config, rare_claim_data):
+    X, y = rare_claim_data
+    exposure = pd.Series(np.random.default_rng(2).integers(1, 13, len(X)).astype(float))
+    model_config.mode = 'tweedie'
+    model = RiskModel(model_config)
+    model.train_pure_premium(X, y * 1000.0 * exposure, exposure=exposure)
+    rate = model.predict_risk_score(X)
+    assert rate.mean() == pytest.approx(y.mean() * 1000.0, rel=0.2)
@@ -0,0 +1,73 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.rollup import RollupConfig, PolicyRollup, build_policy_table, claim_frequency
+
+@pytest.fixture
+def transactions():
+    """Cover × month rows for 50 covers over up to 12 months, in shuffled order."""
+    rng = np.random.default_rng(5)
+    rows = []
+    for cover in range(50):
+        start = rng.integers(0, 6)
+        for month in range(start, start + rng.integers(1, 7)):
+            rows.append({
+                'UnderwrittenCoverID': cover,
+                'PolicyID': cover // 3,
+                'TransactionMonth': f'2014-{month + 1:02d}-01 00:00:00',
+                'Province': rng.choice(['Gauteng', 'Limpopo']),
+                'SumInsured': float(rng.integers(1, 5) * 10000),
+                'TotalPremium': rng.uniform(10, 100),
+                'TotalClaims': rng.gamma(2.0, 5000.0) if rng.random() < 0.1 else 0.0
+            })
+    return pd.DataFrame(rows).sample(frac=1, random_state=0).reset_index(drop=True)
+
+@pytest.fixture
+def rollup_config():
+    return RollupConfig(attributes=['Province', 'SumInsured'], chunksize=37)
+
+def test_chunked_rollup_matches_full_groupby(transactions, rollup_config):
+    rollup = PolicyRollup(rollup_config)
+    for start in range(0, len(transactions), rollup_config.chunksize):
+        rollup.partial_fit(transactions.iloc[start:start + rollup_config.chunksize])
+    table = rollup.table().set_index('UnderwrittenCoverID').sort_index()
+
+    grouped = transactions.groupby('UnderwrittenCoverID')
+    np.testing.assert_allclose(table['premium'], grouped['TotalPremium'].sum())
+    np.testing.assert_allclose(table['claims'], grouped['TotalClaims'].sum())
+    np.testing.assert_array_equal(table['earned_months'], grouped.size())
+    assert (table['first_month'] == grouped['TransactionMonth'].min().str[:7]).all()
+    assert (table['last_month'] == grouped['TransactionMonth'].max().str[:7]).all()
+
+    ordered = transactions.sort_values('TransactionMonth')
+    last_province = ordered.groupby('UnderwrittenCoverID')['Province'].last()
+    assert (table['last_Province'] == last_province).all()
+
+def test_build_policy_table_from_file(tmp_path, transactions, rollup_config):
+    path = tmp_path / "raw.txt"
+    transactions.to_csv(path, sep='|', index=False)
+    out = tmp_path / "policies.parquet"
+    rollup_config.key = 'PolicyID'
+    table = build_policy_table(path, rollup_config, output_path=out)
+    assert len(table) == transactions['PolicyID'].nunique()
+    pd.testing.assert_frame_equal(pd.read_parquet(out), table)
+
+def test_claim_frequency_per_exposure_year(transactions, rollup_config):
+    table = PolicyRollup(rollup_config).partial_fit(transactions).table()
+    expected = (transactions['TotalClaims'] > 0).sum() / (len(transactions) / 12)
+    assert claim_frequency(table) == pytest.approx(expected)
+    assert set(claim_frequency(table, by=['last_Province']).index) <= {'Gauteng', 'Limpopo'}
+
+def test_policy_key_counts_distinct_months(transactions, rollup_config):
+    rollup_config.key = 'PolicyID'
+    rollup = PolicyRollup(rollup_config)
+    for start in range(0, len(transactions), rollup_config.chunksize):
+        rollup.partial_fit(transactions.iloc[start:start + rollup_config.chunksize])
+    table = rollup.table().set_index('PolicyID').sort_index()
+
+    months = transactions.assign(claim=transactions['TotalClaims'] > 0) \
+        .groupby(['PolicyID', 'TransactionMonth'])['claim'].any()
+    np.testing.assert_array_equal(table['earned_months'], months.groupby('PolicyID').size())
+    np.testing.assert_array_equal(table['claim_months'], months.groupby('PolicyID').sum())
+    # Covers of one policy overlap in time, so policy-months are fewer than cover-months
+    assert table['earned_months'].sum() < len(transactions)
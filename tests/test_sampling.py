@@ -0,0 +1,54 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.sampling import SamplerConfig, StratifiedReservoirSampler, stratified_sample, weighted_describe, WEIGHT_COLUMN
+
+@pytest.fixture
+def book():
+    """Synthetic book with a rare claim class across three provinces."""
+    rng = np.random.default_rng(0)
+    n = 3000
+    claims = np.where(rng.random(n) < 0.05, rng.gamma(2.0, 10000.0, n), 0.0)
+    return pd.DataFrame({
+        'Province': rng.choice(['Gauteng', 'Western Cape', 'Limpopo'], n),
+        'TotalPremium': rng.uniform(50, 500, n),
+        'TotalClaims': claims
+    })
+
+def test_reservoir_sizes_and_weights(book):
+    config = SamplerConfig(n_per_stratum=50, claim_oversample=2.0, chunksize=500)
+    sampler = StratifiedReservoirSampler(config)
+    for start in range(0, len(book), config.chunksize):
+        sampler.partial_fit(book.iloc[start:start + config.chunksize])
+    sample = sampler.sample()
+    sizes = sample.groupby(['Province', 'HasClaim']).size()
+    population = book.assign(HasClaim=(book['TotalClaims'] > 0).astype(int)) \
+        .groupby(['Province', 'HasClaim']).size()
+    for (province, has_claim), n in sizes.items():
+        assert n == min(population[(province, has_claim)], 100 if has_claim else 50)
+    # Weighted counts recover the population exactly
+    assert sample[WEIGHT_COLUMN].sum() == pytest.approx(len(book))
+
+def test_sample_rows_come_from_source(book):
+    config = SamplerConfig(n_per_stratum=20, chunksize=700)
+    sampler = StratifiedReservoirSampler(config)
+    for start in range(0, len(book), config.chunksize):
+        sampler.partial_fit(book.iloc[start:start + config.chunksize])
+    sample = sampler.sample()
+    pd.testing.assert_series_equal(sample['TotalClaims'], book.loc[sample.index, 'TotalClaims'])
+
+def test_stratified_sample_is_reproducible(tmp_path, book):
+    path = tmp_path / "book.txt"
+    book.to_csv(path, sep='|', index=False)
+    first = stratified_sample(path, SamplerConfig(n_per_stratum=30, chunksize=400))
+    second = stratified_sample(path, SamplerConfig(n_per_stratum=30, chunksize=1000))
+    pd.testing.assert_frame_equal(first, second)
+
+def test_weighted_describe_recovers_book_statistics(book):
+    config = SamplerConfig(n_per_stratum=300, claim_oversample=3.0, chunksize=1000)
+    sample = StratifiedReservoirSampler(config).partial_fit(book).sample()
+    summary = weighted_describe(sample['TotalClaims'], sample[WEIGHT_COLUMN])
+    assert summary['count'] == pytest.approx(len(book))
+    assert summary['mean'] == pytest.approx(book['TotalClaims'].mean(), rel=0.15)
+    # Unweighted, the oversampled claims inflate the mean
+    assert sample['TotalClaims'].mean() > 1.5 * book['TotalClaims'].mean()
@@ -0,0 +1,73 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.models import ModelConfig, DataPreprocessor
+from src.similarity import SimilarPolicyIndex
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(11)
+    n = 2000
+    return pd.DataFrame({
+        'PostalCode': rng.choice(['1000', '2000', '3000', '4000'], n),
+        'VehicleType': rng.choice(['SUV', 'Sedan', 'Truck'], n),
+        'SumInsured': rng.uniform(10000, 500000, n),
+        'RegistrationYear': rng.integers(1995, 2016, n).astype(float),
+        'TotalClaims': np.where(rng.random(n) < 0.05, rng.gamma(2.0, 5000.0, n), 0.0),
+        'UnderwrittenCoverID': np.arange(n) + 100000
+    })
+
+@pytest.fixture
+def fitted_preprocessor(history):
+    config = ModelConfig(categorical_features=['PostalCode', 'VehicleType'],
+                         numerical_features=['SumInsured', 'RegistrationYear'])
+    pre = DataPreprocessor(config)
+    pre.fit_transform(history[config.numerical_features + config.categorical_features])
+    return pre
+
+def brute_force(history, pre, quote, k):
+    """Reference: exact scan restricted to the quote's PostalCode."""
+    same = history[history['PostalCode'] == quote['PostalCode'].iloc[0]]
+    X = pre.transform(same[['SumInsured', 'RegistrationYear', 'PostalCode', 'VehicleType']])
+    q = pre.transform(quote[['SumInsured', 'RegistrationYear', 'PostalCode', 'VehicleType']])
+    distance = np.sqrt(((X[:, :2] - q[0, :2]) ** 2).sum(axis=1)) + (X[:, 3] != q[0, 3])
+    return same['UnderwrittenCoverID'].to_numpy()[np.argsort(distance, kind='stable')[:k]]
+
+def test_query_matches_brute_force(history, fitted_preprocessor):
+    index = SimilarPolicyIndex.build(history, fitted_preprocessor, id_column='UnderwrittenCoverID')
+    quote = history.iloc[[17]].drop(columns=['TotalClaims'])
+    hits = index.query(quote, k=5)
+    assert hits['row_id'].iloc[0] == history['UnderwrittenCoverID'].iloc[17]
+    assert hits['distance'].iloc[0] == pytest.approx(0.0, abs=1e-5)
+    assert set(hits['row_id']) == set(brute_force(history, fitted_preprocessor, quote, 5))
+    assert hits['distance'].is_monotonic_increasing
+
+def test_saved_index_is_memory_mapped(tmp_path, history, fitted_preprocessor):
+    index = SimilarPolicyIndex.build(history, fitted_preprocessor, id_column='UnderwrittenCoverID')
+    index.save(tmp_path / "index")
+    loaded = SimilarPolicyIndex.load(tmp_path / "index")
+    assert isinstance(loaded.arrays['numeric'], np.memmap)
+    quotes = history.iloc[:3].drop(columns=['TotalClaims'])
+    pd.testing.assert_frame_equal(loaded.query(quotes, k=4), index.query(quotes, k=4))
+
+def test_unknown_postal_code_falls_back_to_full_book(history, fitted_preprocessor):
+    index = SimilarPolicyIndex.build(history, fitted_preprocessor)
+    quote = history.iloc[[0]].assign(PostalCode='9999')
+    hits = index.query(quote, k=3)
+    assert len(hits) == 3
+    assert {'TotalClaims', 'distance', 'row_id'} <= set(hits.columns)
+
+def test_build_rejects_repeated_policy_rows(history, fitted_preprocessor):
+    monthly = pd.concat([history, history.iloc[:10]])
+    with pytest.raises(ValueError):
+        SimilarPolicyIndex.build(monthly, fitted_preprocessor, id_column='UnderwrittenCoverID')
+
+def test_missing_categories_are_treated_as_unknown(history, fitted_preprocessor):
+    history = history.copy()
+    history.loc[[3, 8], 'PostalCode'] = np.nan
+    history.loc[[5], 'VehicleType'] = np.nan
+    index = SimilarPolicyIndex.build(history, fitted_preprocessor, id_column='UnderwrittenCoverID')
+    assert index.arrays['codes'].min() == -1
+    quote = history.iloc[[3]].drop(columns=['TotalClaims'])
+    hits = index.query(quote, k=3)
+    assert len(hits) == 3 and hits['distance'].notna().all()
@@ -0,0 +1,74 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.models import ModelConfig, RiskModel
+from src.simulation import (SimulationConfig, QuantileSketch, simulate_aggregate_losses,
+                            risk_capital_summary, risk_model_inputs, TOTAL_SEGMENT)
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(8)
+    n = 5000
+    return pd.DataFrame({
+        'claim_prob': rng.uniform(0.001, 0.02, n),
+        'severity': rng.uniform(5000, 50000, n),
+        'Province': rng.choice(['Gauteng', 'Limpopo', 'Western Cape'], n)
+    })
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(10, 2, 50000)
+    sketch, merged = QuantileSketch(0.01), QuantileSketch(0.01)
+    sketch.add(values)
+    for part in np.array_split(values, 7):
+        part_sketch = QuantileSketch(0.01)
+        part_sketch.add(part)
+        merged.merge(part_sketch)
+    np.testing.assert_array_equal(sketch.counts, merged.counts)
+    for q in [0.5, 0.9, 0.99]:
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+    tail = np.sort(values)[int(0.99 * len(values)):]
+    assert sketch.tail_mean(0.99) == pytest.approx(tail.mean(), rel=0.02)
+
+def test_simulated_mean_matches_expected_loss(book):
+    config = SimulationConfig(n_scenarios=4000, scenarios_per_block=1000, lognormal_sigma=1.0)
+    sketches = simulate_aggregate_losses(book['claim_prob'], book['severity'], book['Province'], config)
+    assert set(sketches) == {'Gauteng', 'Limpopo', 'Western Cape', TOTAL_SEGMENT}
+    expected = (book['claim_prob'] * book['severity']).sum()
+    assert sketches[TOTAL_SEGMENT].mean() == pytest.approx(expected, rel=0.02)
+    assert sketches[TOTAL_SEGMENT].count == 4000
+
+    summary = risk_capital_summary(sketches).set_index('segment')
+    total = summary.loc[TOTAL_SEGMENT]
+    assert total['expected_loss'] < total['VaR_0.95'] < total['VaR_0.99'] <= total['TVaR_0.99']
+
+def test_parallel_blocks_are_reproducible(book):
+    config = SimulationConfig(n_scenarios=2500, scenarios_per_block=1000, severity='pareto')
+    sequential = simulate_aggregate_losses(book['claim_prob'], book['severity'], book['Province'], config)
+    config.n_jobs = 2
+    parallel = simulate_aggregate_losses(book['claim_prob'], book['severity'], book['Province'], config)
+    for segment in sequential:
+        np.testing.assert_array_equal(sequential[segment].counts, parallel[segment].counts)
+
+def test_certain_claims_are_bernoulli_not_poisson():
+    # p = 1 for every policy: exactly one claim per policy per scenario, never more
+    config = SimulationConfig(n_scenarios=200, scenarios_per_block=200, lognormal_sigma=1e-6)
+    sketches = simulate_aggregate_losses(np.ones(50), np.full(50, 1000.0), ['A'] * 50, config)
+    assert sketches['A'].quantile(0.01) == pytest.approx(50_000, rel=0.02)
+    assert sketches['A'].quantile(0.99) == pytest.approx(50_000, rel=0.02)
+
+def test_risk_model_inputs_preserve_expected_loss():
+    rng = np.random.default_rng(9)
+    n = 2000
+    X = pd.DataFrame({'VehicleType': rng.choice(['SUV', 'Truck'], n), 'SumInsured': rng.normal(0, 1, n)})
+    has_claim = (rng.random(n) < np.where(X['VehicleType'] == 'Truck', 0.1, 0.03)).astype(int)
+    model = RiskModel(ModelConfig(categorical_features=['VehicleType'], numerical_features=['SumInsured']))
+    model.train_classifier(X, pd.Series(has_claim))
+    model.train_regressor(X, pd.Series(has_claim * rng.gamma(2.0, 10000.0, n)))
+
+    claim_prob, severity = risk_model_inputs(model, X)
+    expected_loss = np.clip(model.reg.predict(model.preprocessor.transform(X)), 0, None)
+    np.testing.assert_allclose(claim_prob * severity, expected_loss)
+    sketches = simulate_aggregate_losses(claim_prob, severity, X['VehicleType'],
+                                         SimulationConfig(n_scenarios=1000, lognormal_sigma=0.5))
+    # Not p² × severity: the simulated mean is the model's expected loss
+    assert sketches[TOTAL_SEGMENT].mean() == pytest.approx(expected_loss.sum(), rel=0.05)
@@ -0,0 +1,99 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.models import ModelConfig, RiskModel
+from src.data_loader import iter_chunks
+from src.validation import ColumnRule, Schema, DataValidationError, validate, validate_rows, scoring_schema
+
+@pytest.fixture
+def schema():
+    return Schema([
+        ColumnRule('CustomValueEstimate', 'numeric', min_value=0),
+        ColumnRule('RegistrationYear', 'numeric', nullable=False, min_value=1900, max_value=2025),
+        ColumnRule('VehicleType', 'categorical', allowed=['SUV', 'Sedan'])
+    ])
+
+def test_violations_are_counted_with_sample_rows(schema):
+    df = pd.DataFrame({
+        'CustomValueEstimate': ['1000', 'abc', None, '-5'],
+        'RegistrationYear': [2010, 2031, np.nan, 1999],
+        'VehicleType': ['SUV', 'Bus', 'Sedan', None]
+    }, index=[10, 11, 12, 13])
+    # Sample rows are positions in the checked stream, not index labels
+    frame = validate(df, schema).to_frame().set_index(['column', 'check'])
+    assert frame.loc[('CustomValueEstimate', 'not_numeric'), 'sample_rows'] == [1]
+    assert frame.loc[('CustomValueEstimate', 'below_min'), 'sample_rows'] == [3]
+    assert frame.loc[('RegistrationYear', 'above_max'), 'sample_rows'] == [1]
+    assert frame.loc[('RegistrationYear', 'null'), 'sample_rows'] == [2]
+    assert frame.loc[('VehicleType', 'unknown_category'), 'sample_rows'] == [1]
+    assert len(frame) == 5
+    assert validate_rows(df, schema).tolist() == [False, True, True, True]
+
+def test_report_accumulates_across_chunks(schema):
+    df = pd.DataFrame({
+        'CustomValueEstimate': np.arange(100, dtype=float) - 50,
+        'RegistrationYear': 2010,
+        'VehicleType': 'SUV'
+    })
+    report = None
+    for start in range(0, 100, 30):
+        report = validate(df.iloc[start:start + 30], schema, report)
+    assert report.rows_checked == 100
+    assert report.counts[('CustomValueEstimate', 'below_min')] == 50
+    assert len(report.samples[('CustomValueEstimate', 'below_min')]) == report.max_samples
+
+def test_parquet_chunks_report_file_rows(tmp_path, schema):
+    df = pd.DataFrame({'CustomValueEstimate': 1.0, 'RegistrationYear': 2010, 'VehicleType': ['SUV'] * 100})
+    df.loc[[5, 75], 'VehicleType'] = 'Bus'
+    path = tmp_path / "book.parquet"
+    df.to_parquet(path, index=False)
+    report = None
+    for chunk in iter_chunks(path, chunksize=30):
+        report = validate(chunk, schema, report)
+    assert report.samples[('VehicleType', 'unknown_category')] == [5, 75]
+
+def test_missing_column_is_reported():
+    report = validate(pd.DataFrame({'a': [1]}), Schema([ColumnRule('b')]))
+    assert report.counts == {('b', 'missing_column'): 1}
+
+def test_scoring_schema_uses_model_vocabulary():
+    config = ModelConfig(categorical_features=['VehicleType'], numerical_features=['SumInsured'],
+                         categories={'VehicleType': ['SUV', 'Sedan']})
+    rules = {rule.name: rule for rule in scoring_schema(config).columns}
+    assert rules['VehicleType'].allowed == ['SUV', 'Sedan']
+    assert rules['SumInsured'].dtype == 'numeric'
+
+@pytest.fixture
+def small_model():
+    config = ModelConfig(categorical_features=['VehicleType'], numerical_features=['SumInsured'])
+    X = pd.DataFrame({'VehicleType': ['SUV', 'Sedan', 'SUV', 'Truck'], 'SumInsured': [1.0, 2.0, 3.0, 4.0]})
+    y = pd.Series([0, 1, 0, 1])
+    model = RiskModel(config)
+    model.train_classifier(X, y)
+    model.train_regressor(X, y * 1000)
+    return model, X
+
+def test_predict_risk_score_masks_invalid_rows(small_model):
+    model, X = small_model
+    bad = X.assign(VehicleType=['SUV', 'Bus', 'SUV', 'Truck'], SumInsured=[1.0, 2.0, 'abc', 4.0])
+    with pytest.warns(UserWarning, match="2 row"):
+        scores = model.predict_risk_score(bad)
+    assert np.isnan(scores).tolist() == [False, True, True, False]
+    np.testing.assert_allclose(scores[[0, 3]], model.predict_risk_score(X)[[0, 3]])
+
+def test_predict_risk_score_on_violation_modes(small_model):
+    model, X = small_model
+    bad = X.assign(VehicleType=['SUV', 'Bus', 'SUV', 'SUV'])
+    with pytest.raises(DataValidationError) as excinfo:
+        model.predict_risk_score(bad, on_violation='raise')
+    assert excinfo.value.report.counts == {('VehicleType', 'unknown_category'): 1}
+    with pytest.warns(UserWarning):
+        assert np.isfinite(model.predict_risk_score(bad, on_violation='warn')).all()
+    # A non-numeric value cannot be scored even in 'warn' mode: only that row is masked
+    worse = bad.assign(SumInsured=[1.0, 2.0, 'abc', '4.0'])
+    with pytest.warns(UserWarning, match="1 row\\(s\\) scored as NaN"):
+        scores = model.predict_risk_score(worse, on_violation='warn')
+    assert np.isnan(scores).tolist() == [False, False, True, False]
+    assert model.predict_risk_score(bad, validate=False).shape == (4,)
+    with pytest.raises(ValueError):
+        model.predict_risk_score(X, on_violation='ignore')